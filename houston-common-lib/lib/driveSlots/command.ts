@@ -1,10 +1,23 @@
 import script from "./script.py?raw";
+import vdevAliasIndexScript from "@/scripts/vdev_alias_index.py?raw";
 
 import { PythonCommand } from "@/process";
 
 export type SlotsCommandOpts = {
     live?: boolean;
     includeNonAliased?: boolean;
+    /**
+     * max number of drives probed with smartctl at once
+     */
+    smartWorkers?: number;
+    /**
+     * seconds to reuse a drive's SMART data in live mode, 0 to disable
+     */
+    smartTtl?: number;
+    /**
+     * seconds to collect udev events for a slot before re-probing it in live mode
+     */
+    debounce?: number;
 }
 
 export function slotsCommand(opts: SlotsCommandOpts = {}) {
@@ -12,8 +25,17 @@ export function slotsCommand(opts: SlotsCommandOpts = {}) {
     if (opts.includeNonAliased) {
         args.push("--include-non-aliased");
     }
+    if (opts.smartWorkers !== undefined) {
+        args.push("--smart-workers", opts.smartWorkers.toString());
+    }
+    if (opts.smartTtl !== undefined) {
+        args.push("--smart-ttl", opts.smartTtl.toString());
+    }
+    if (opts.debounce !== undefined) {
+        args.push("--debounce", opts.debounce.toString());
+    }
     if (opts.live) {
         args.push("--live");
     }
-    return new PythonCommand(script, args, { superuser: "try" });
+    return new PythonCommand(`${vdevAliasIndexScript}\n${script}`, args, { superuser: "try" });
 }
@@ -6,6 +6,7 @@ import { Server } from "@/server";
 type LiveDriveSlotsMessageAllSlots = {
   type: "reportAll";
   slots: DriveSlot[];
+  smartCache?: { hits: number; misses: number; entries: number };
 };
 
 type LiveDriveSlotsMessageDriveAdded = {
@@ -18,11 +19,26 @@ type LiveDriveSlotsCtx = {
   slots: DriveSlot[];
   stop: boolean;
   retries: number;
+  /**
+   * partial trailing line of stream output
+   */
+  buffer: string;
 };
 
 type LiveDriveSlotsMessage = LiveDriveSlotsMessageAllSlots | LiveDriveSlotsMessageDriveAdded;
 
 function onStream(output: string, ctx: LiveDriveSlotsCtx, setter: (slots: DriveSlot[]) => void) {
+  // a chunk may hold several newline-delimited messages, or only part of one
+  const lines = (ctx.buffer + output).split("\n");
+  ctx.buffer = lines.pop() ?? "";
+  for (const line of lines) {
+    if (line.trim()) {
+      onMessage(line, ctx, setter);
+    }
+  }
+}
+
+function onMessage(output: string, ctx: LiveDriveSlotsCtx, setter: (slots: DriveSlot[]) => void) {
   try {
     const message = JSON.parse(output) as LiveDriveSlotsMessage;
 
@@ -52,15 +68,17 @@ export function startLiveDriveSlotsWatcher(
   opts?: LiveDriveSlotsOpts
 ): LiveDriveSlotsHandle {
   const ctx: LiveDriveSlotsCtx = {
-    proc: server.spawnProcess(slotsCommand({ live: true, includeNonAliased: opts?.includeNonAliased }), true),
+    proc: server.spawnProcess(slotsCommand({ ...opts, live: true }), true),
     slots: [],
     stop: false,
     retries: 3,
+    buffer: "",
   };
   const start = () => {
     if (ctx.stop) {
       return;
     }
+    ctx.buffer = "";
     ctx.proc.execute();
     ctx.proc.stream((output) => onStream(output, ctx, setter));
     ctx.proc.wait().match(
@@ -83,5 +101,8 @@ export function startLiveDriveSlotsWatcher(
       ctx.stop = true;
       ctx.proc.terminate();
     },
+    requestFullReport: () => {
+      ctx.proc.write("reportAll\n", true);
+    },
   };
 }
@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
+# get_vdev_alias_index() comes from scripts/vdev_alias_index.py, prepended by command.ts
 
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
-import pyudev, json, re, subprocess, argparse
+import pyudev, json, os, queue, select, subprocess, sys, argparse, threading, time
 
 AUTO_REFRESH_TIME = 30
+SMART_TIMEOUT = 5
+DEFAULT_SMART_WORKERS = 8
+DEFAULT_SMART_TTL = 300
+DEFAULT_DEBOUNCE = 1.0
 
 
 def get_smart_info(device: pyudev.Device) -> dict:
@@ -14,11 +20,19 @@ def get_smart_info(device: pyudev.Device) -> dict:
         stderr=subprocess.PIPE,
         universal_newlines=True,
     )
-    stdout, stderr = child.communicate(timeout=5)
-    ret = child.wait()
+    try:
+        stdout, stderr = child.communicate(timeout=SMART_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        child.kill()
+        child.communicate()
+        return None
+    ret = child.returncode
     if ret & 2:  # failed to open
         return None
-    smart_json = json.loads(stdout)
+    try:
+        smart_json = json.loads(stdout)
+    except ValueError:
+        return None
 
     smart_info["modelFamily"] = (
         smart_json["model_family"] if "model_family" in smart_json else "?"
@@ -53,7 +67,70 @@ def get_smart_info(device: pyudev.Device) -> dict:
     return smart_info
 
 
-def get_drive(device: pyudev.Device) -> dict:
+def try_get_smart_info(device: pyudev.Device) -> dict:
+    """get_smart_info that reports any failure as None instead of raising,
+    so one bad drive can't take down the rest of a parallel probe"""
+    try:
+        return get_smart_info(device)
+    except Exception:
+        return None
+
+
+def get_serial(device: pyudev.Device):
+    return device.get("ID_SERIAL_SHORT", device.get("ID_SERIAL"))
+
+
+class SmartCache:
+    """SMART results keyed by drive serial. Entries are reused until they are
+    older than ttl seconds or udev reports an add/change/remove for the disk."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, device: pyudev.Device) -> dict:
+        serial = get_serial(device)
+        if serial is None or self.ttl <= 0:
+            return try_get_smart_info(device)
+        with self.lock:
+            entry = self.entries.get(serial)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        smart_info = try_get_smart_info(device)
+        with self.lock:
+            self.entries[serial] = (time.monotonic(), smart_info)
+        return smart_info
+
+    def peek(self, device: pyudev.Device) -> tuple:
+        """(True, smart_info) if a fresh entry exists, (False, None) otherwise. Never probes."""
+        serial = get_serial(device)
+        if serial is None or self.ttl <= 0:
+            return False, None
+        with self.lock:
+            entry = self.entries.get(serial)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                return True, entry[1]
+        return False, None
+
+    def invalidate(self, device: pyudev.Device):
+        serial = get_serial(device)
+        if serial is None:
+            return
+        with self.lock:
+            self.entries.pop(serial, None)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+
+def get_drive(device: pyudev.Device, smart_info: dict) -> dict:
     drive = {}
     drive["path"] = device.device_node
     drive["pathByPath"] = next(
@@ -62,93 +139,263 @@ def get_drive(device: pyudev.Device) -> dict:
     )
     drive["capacity"] = int(device.attributes.get("size", 0)) * 512
     drive["model"] = device.get("ID_MODEL", "unknown")
-    drive["serial"] = device.get("ID_SERIAL_SHORT", device.get("ID_SERIAL", "unknown"))
+    drive["serial"] = get_serial(device) or "unknown"
     drive["firmwareVersion"] = device.get("ID_REVISION", "unknown")
     drive["rotationRate"] = int(device.get("ID_ATA_ROTATION_RATE_RPM", 0))
     drive["partitionCount"] = len(
         [child for child in device.children if child.device_type == "partition"]
     )
-    drive["smartInfo"] = get_smart_info(device)
+    drive["smartInfo"] = smart_info
     return drive
 
 
-def handle_remove(device: pyudev.Device, slot: dict):
-    slot["drive"] = None
-    message = {"type": "change", "slot": slot}
-    print(json.dumps(message, indent=None), flush=True)
-
-
-def handle_add_or_change(device: pyudev.Device, slot: dict):
-    slot["drive"] = get_drive(device)
-    message = {"type": "change", "slot": slot}
-    print(json.dumps(message, indent=None), flush=True)
-
-
-def monitor_changes(udev_ctx: pyudev.Context, args):
-    udev_monitor = pyudev.Monitor.from_netlink(udev_ctx)
-
-    udev_monitor.filter_by("block", "disk")
-
-    while True:
-        for device in iter(partial(udev_monitor.poll, AUTO_REFRESH_TIME), None):
-            if device.device_path.startswith("/devices/virtual"):
-                continue
-            slot = {}
-
-            if "SLOT_NAME" in device:
-                slot["slotId"] = device["SLOT_NAME"]
-            elif "ID_VDEV" in device:
-                slot["slotId"] = device["ID_VDEV"]
-            elif args.include_non_aliased:
-                slot["slotId"] = "unknown"
-            else:
-                continue
-
-            if device.action == "remove":
-                handle_remove(device, slot)
-            elif device.action in ["add", "change"]:
-                handle_add_or_change(device, slot)
-        report_initial(udev_ctx, args)
-
-
-def get_slots(udev_ctx: pyudev.Context, args):
-    slotMap = {}
+def get_drives(devices: list, args, smart_cache: SmartCache) -> list:
+    """Probe drives, running smartctl for all of them through a bounded worker pool.
+    Returned drives are in the same order as devices."""
+    if not devices:
+        return []
+    with ThreadPoolExecutor(max_workers=args.smart_workers) as pool:
+        smart_infos = list(pool.map(smart_cache.get, devices))
+    return [get_drive(device, smart_info) for device, smart_info in zip(devices, smart_infos)]
+
+
+def get_aliased_slot_id(device: pyudev.Device, alias_index: VdevAliasIndex):
+    if "SLOT_NAME" in device:
+        return device["SLOT_NAME"]
+    if "ID_VDEV" in device:
+        return device["ID_VDEV"]
+    if device.device_node is not None:
+        return alias_index.slot_for_device(device.device_node)
+    return None
+
+
+def get_slot_id(device: pyudev.Device, args):
+    slotId = get_aliased_slot_id(device, get_vdev_alias_index())
+    if slotId is not None:
+        return slotId
+    if args.include_non_aliased:
+        return "unknown"
+    return None
+
+
+def get_slot_devices(udev_ctx: pyudev.Context, args) -> list:
+    """[(slotId, device or None)] in report order: aliased slots, then non-aliased
+    drives. Only reads udev, nothing is probed."""
+    alias_index = get_vdev_alias_index()
+    slotMap = {slotId: None for slotId in alias_index.slots()}
     nonAliased = []
 
-    with open("/etc/vdev_id.conf", "r") as vdev_id:
-        for line in vdev_id:
-            if not line.startswith("alias"):
-                continue
-            [_, slotId, *_] = re.split(r"\s+", line)
-            slotMap[slotId] = None
-
     for device in udev_ctx.list_devices(subsystem="block", DEVTYPE="disk"):
         if device.device_path.startswith("/devices/virtual"):
             continue
-        slotId = None
-        if "SLOT_NAME" in device:
-            slotId = device["SLOT_NAME"]
-        elif "ID_VDEV" in device:
-            slotId = device["ID_VDEV"]
+        slotId = get_aliased_slot_id(device, alias_index)
 
         if slotId is not None:
-            slotMap[slotId] = get_drive(device)
+            slotMap[slotId] = device
         elif args.include_non_aliased:
-            nonAliased.append(get_drive(device))
+            nonAliased.append(("unknown", device))
 
-    aliasedSlots = list(map(lambda x: {"slotId": x[0], "drive": x[1]}, slotMap.items()))
+    return list(slotMap.items()) + nonAliased
 
-    return aliasedSlots + list(
-        map(lambda drive: {"slotId": "unknown", "drive": drive}, nonAliased)
-    )
 
+def get_slots(udev_ctx: pyudev.Context, args, smart_cache: SmartCache):
+    slotDevices = get_slot_devices(udev_ctx, args)
+    drives = iter(
+        get_drives([device for _, device in slotDevices if device is not None], args, smart_cache)
+    )
+    return [
+        {"slotId": slotId, "drive": next(drives) if device is not None else None}
+        for slotId, device in slotDevices
+    ]
+
+
+class LiveSlotsWatcher:
+    """Streams slot state for --live mode. Keeps the state last sent to the client
+    so that periodic refreshes only emit change messages for slots that differ.
+    A full reportAll is sent on startup, when "reportAll" is written to stdin, or
+    when a change can't be expressed per slot.
+
+    Slots are reported from udev alone first. Drives without fresh SMART data are
+    queued on the SMART worker pool and a change message follows for each one as
+    its probe completes."""
+
+    def __init__(self, udev_ctx: pyudev.Context, args, smart_cache: SmartCache):
+        self.udev_ctx = udev_ctx
+        self.args = args
+        self.smart_cache = smart_cache
+        self.slots = {}  # slotId -> last emitted slot, aliased slots only
+        self.non_aliased = []
+        self.stdin_buffer = b""
+        self.pending = {}  # slot key -> [latest device event, deadline]
+        self.smart_pool = ThreadPoolExecutor(max_workers=args.smart_workers)
+        self.smart_inflight = set()
+        self.smart_results = queue.Queue()
+        self.wake_r, self.wake_w = os.pipe()
+
+    def emit(self, message: dict):
+        print(json.dumps(message, indent=None), flush=True)
+
+    def remember(self, slots: list):
+        self.slots = {slot["slotId"]: slot for slot in slots if slot["slotId"] != "unknown"}
+        self.non_aliased = [slot for slot in slots if slot["slotId"] == "unknown"]
+
+    def last_smart_info(self, slotId: str, device: pyudev.Device) -> dict:
+        """smartInfo last sent for this drive, so a re-report doesn't blank it
+        while a fresh probe is in flight"""
+        candidates = [self.slots.get(slotId)] if slotId != "unknown" else self.non_aliased
+        for slot in candidates:
+            drive = slot and slot["drive"]
+            if drive and drive["path"] == device.device_node and drive["serial"] == (get_serial(device) or "unknown"):
+                return drive["smartInfo"]
+        return None
 
-def report_initial(udev_ctx: pyudev.Context, args):
-    message = {
-        "type": "reportAll",
-        "slots": get_slots(udev_ctx, args),
-    }
-    print(json.dumps(message, indent=None), flush=True)
+    def get_quick_slot(self, slotId: str, device: pyudev.Device) -> dict:
+        """Slot from udev/sysfs data only; queues a SMART probe unless the cache is fresh"""
+        if device is None:
+            return {"slotId": slotId, "drive": None}
+        fresh, smart_info = self.smart_cache.peek(device)
+        if not fresh:
+            smart_info = self.last_smart_info(slotId, device)
+            self.request_smart(slotId, device)
+        return {"slotId": slotId, "drive": get_drive(device, smart_info)}
+
+    def get_quick_slots(self) -> list:
+        return [self.get_quick_slot(slotId, device) for slotId, device in get_slot_devices(self.udev_ctx, self.args)]
+
+    def request_smart(self, slotId: str, device: pyudev.Device):
+        key = get_serial(device) or device.device_path
+        if key in self.smart_inflight:
+            return
+        self.smart_inflight.add(key)
+
+        def probe():
+            try:
+                self.smart_results.put((key, slotId, device, self.smart_cache.get(device)))
+            finally:
+                os.write(self.wake_w, b"\0")
+
+        self.smart_pool.submit(probe)
+
+    def apply_smart_results(self):
+        os.read(self.wake_r, 4096)
+        non_aliased_changed = False
+        while True:
+            try:
+                key, slotId, device, smart_info = self.smart_results.get_nowait()
+            except queue.Empty:
+                break
+            self.smart_inflight.discard(key)
+            # drop results for drives that were since removed or replaced
+            candidates = [self.slots.get(slotId)] if slotId != "unknown" else self.non_aliased
+            for slot in candidates:
+                drive = slot and slot["drive"]
+                if not drive or drive["path"] != device.device_node or drive["serial"] != (get_serial(device) or "unknown"):
+                    continue
+                if drive["smartInfo"] == smart_info:
+                    break
+                slot = {"slotId": slotId, "drive": {**drive, "smartInfo": smart_info}}
+                if slotId == "unknown":
+                    self.non_aliased = [slot if s["drive"] is drive else s for s in self.non_aliased]
+                    non_aliased_changed = True
+                else:
+                    self.emit_change(slot)
+                break
+        # non-aliased drives all share slotId "unknown", so resend everything
+        if non_aliased_changed:
+            self.report_all(list(self.slots.values()) + self.non_aliased)
+
+    def report_all(self, slots: list = None):
+        if slots is None:
+            slots = self.get_quick_slots()
+        self.remember(slots)
+        self.emit({"type": "reportAll", "slots": slots, "smartCache": self.smart_cache.stats()})
+
+    def report_changes(self):
+        slots = self.get_quick_slots()
+        aliased = [slot for slot in slots if slot["slotId"] != "unknown"]
+        non_aliased = [slot for slot in slots if slot["slotId"] == "unknown"]
+        # slots appearing/disappearing and non-aliased drives (which all share
+        # slotId "unknown") can't be addressed by a change message
+        if [slot["slotId"] for slot in aliased] != list(self.slots.keys()) or non_aliased != self.non_aliased:
+            self.report_all(slots)
+            return
+        for slot in aliased:
+            if self.slots[slot["slotId"]] != slot:
+                self.emit_change(slot)
+
+    def emit_change(self, slot: dict):
+        if slot["slotId"] != "unknown":
+            self.slots[slot["slotId"]] = slot
+        self.emit({"type": "change", "slot": slot})
+
+    def handle_event(self, device: pyudev.Device):
+        """Queue a udev event. Events for the same slot arriving within the
+        debounce window are merged into a single re-probe of the latest one."""
+        if device.device_path.startswith("/devices/virtual"):
+            return
+        self.smart_cache.invalidate(device)
+        slotId = get_slot_id(device, self.args)
+        if slotId is None:
+            return
+        # non-aliased drives all share slotId "unknown"
+        key = slotId if slotId != "unknown" else device.device_path
+        if key in self.pending:
+            self.pending[key][0] = device
+        else:
+            self.pending[key] = [device, time.monotonic() + self.args.debounce]
+
+    def next_deadline(self) -> float:
+        return min((deadline for _, deadline in self.pending.values()), default=None)
+
+    def flush_pending(self):
+        now = time.monotonic()
+        due = [device for device, deadline in self.pending.values() if deadline <= now]
+        if not due:
+            return
+        self.pending = {key: entry for key, entry in self.pending.items() if entry[1] > now}
+        for device in due:
+            slotId = get_slot_id(device, self.args)
+            if device.action == "remove":
+                self.emit_change({"slotId": slotId, "drive": None})
+            elif device.action in ["add", "change"]:
+                self.emit_change(self.get_quick_slot(slotId, device))
+
+    def handle_stdin(self) -> bool:
+        """Returns False once stdin is closed"""
+        data = os.read(sys.stdin.fileno(), 4096)
+        if not data:
+            return False
+        *lines, self.stdin_buffer = (self.stdin_buffer + data).split(b"\n")
+        for line in lines:
+            if line.strip() == b"reportAll":
+                self.report_all()
+        return True
+
+    def run(self):
+        udev_monitor = pyudev.Monitor.from_netlink(self.udev_ctx)
+        udev_monitor.filter_by("block", "disk")
+        udev_monitor.start()
+
+        self.report_all()
+        inputs = [udev_monitor, sys.stdin, self.wake_r]
+        next_refresh = time.monotonic() + AUTO_REFRESH_TIME
+        while True:
+            wake = next_refresh
+            deadline = self.next_deadline()
+            if deadline is not None:
+                wake = min(wake, deadline)
+            readable, _, _ = select.select(inputs, [], [], max(0, wake - time.monotonic()))
+            if udev_monitor in readable:
+                for device in iter(partial(udev_monitor.poll, 0), None):
+                    self.handle_event(device)
+            self.flush_pending()
+            if self.wake_r in readable:
+                self.apply_smart_results()
+            if sys.stdin in readable and not self.handle_stdin():
+                inputs.remove(sys.stdin)
+            if time.monotonic() >= next_refresh:
+                self.report_changes()
+                next_refresh = time.monotonic() + AUTO_REFRESH_TIME
 
 
 def main():
@@ -157,15 +404,38 @@ def main():
     parser.add_argument(
         "--include-non-aliased", action="store_true", default=False, required=False
     )
+    parser.add_argument(
+        "--smart-workers",
+        type=int,
+        default=DEFAULT_SMART_WORKERS,
+        required=False,
+        help=f"max number of concurrent smartctl probes (default {DEFAULT_SMART_WORKERS})",
+    )
+    parser.add_argument(
+        "--smart-ttl",
+        type=float,
+        default=DEFAULT_SMART_TTL,
+        required=False,
+        help=f"seconds to reuse a drive's SMART data in --live mode, 0 to disable (default {DEFAULT_SMART_TTL})",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        required=False,
+        help=f"seconds to collect udev events for a slot before re-probing it in --live mode (default {DEFAULT_DEBOUNCE})",
+    )
     args = parser.parse_args()
+    if args.smart_workers < 1:
+        parser.error("--smart-workers must be at least 1")
 
     udev_ctx = pyudev.Context()
+    smart_cache = SmartCache(args.smart_ttl)
 
     if args.live:
-        report_initial(udev_ctx, args)
-        monitor_changes(udev_ctx, args)
+        LiveSlotsWatcher(udev_ctx, args, smart_cache).run()
     else:
-        print(json.dumps(get_slots(udev_ctx, args)))
+        print(json.dumps(get_slots(udev_ctx, args, smart_cache)))
 
 
 if __name__ == "__main__":
@@ -35,6 +35,7 @@ export type Drive = {
   partitionCount: number;
   /**
    * smartctl info if user can access
+   * live watchers report null until the drive's first SMART probe completes
    */
   smartInfo: SmartInfo | null;
 };
@@ -163,8 +164,24 @@ export type LiveDriveSlotsOpts = {
    * Include drives that aren't in aliased slots, e.g. boot drives
    */
   includeNonAliased?: boolean;
+  /**
+   * Max number of drives probed with smartctl at once
+   */
+  smartWorkers?: number;
+  /**
+   * Seconds to reuse a drive's SMART data, 0 to disable
+   */
+  smartTtl?: number;
+  /**
+   * Seconds to collect udev events for a slot before re-probing it
+   */
+  debounce?: number;
 }
 
 export type LiveDriveSlotsHandle = {
   stop: () => void;
+  /**
+   * Ask the watcher to resend every slot. Periodic refreshes only send slots that changed.
+   */
+  requestFullReport: () => void;
 };
@@ -6,19 +6,28 @@ import {
 } from './CloudSync';
 import {
     RemoteManagerType,
-    CloudAuthParameterType
+    CloudAuthParameterType,
+    CloudSyncRemoteProbe
 } from './types';
 
 // @ts-ignore
-import get_cloud_sync_remotes_script from '@/scripts/get-rclone-remotes.py?raw';
+import get_cloud_sync_remotes_script_body from '@/scripts/get-rclone-remotes.py?raw';
 // @ts-ignore
-import create_cloud_sync_remote_script from '@/scripts/create-rclone-remote.py?raw';
+import create_cloud_sync_remote_script_body from '@/scripts/create-rclone-remote.py?raw';
 // @ts-ignore
-import update_cloud_sync_remote_script from '@/scripts/update-rclone-remote.py?raw';
+import update_cloud_sync_remote_script_body from '@/scripts/update-rclone-remote.py?raw';
 // @ts-ignore
-import delete_cloud_sync_remote_script from '@/scripts/delete-rclone-remote.py?raw';
+import delete_cloud_sync_remote_script_body from '@/scripts/delete-rclone-remote.py?raw';
+// @ts-ignore
+import rclone_conf_store_module from '@/scripts/rclone_conf_store.py?raw';
 
 const { useSpawn } = legacy;
+
+const get_cloud_sync_remotes_script = `${rclone_conf_store_module}\n${get_cloud_sync_remotes_script_body}`;
+const create_cloud_sync_remote_script = `${rclone_conf_store_module}\n${create_cloud_sync_remote_script_body}`;
+const update_cloud_sync_remote_script = `${rclone_conf_store_module}\n${update_cloud_sync_remote_script_body}`;
+const delete_cloud_sync_remote_script = `${rclone_conf_store_module}\n${delete_cloud_sync_remote_script_body}`;
+
 export class RemoteManager implements RemoteManagerType {
     cloudSyncRemotes: CloudSyncRemote[];
 
@@ -92,6 +101,28 @@ export class RemoteManager implements RemoteManagerType {
         }
     }
 
+    /**
+     * Check that remotes actually work: reachability, latency and quota (when the
+     * backend reports one), probed concurrently. All remotes unless names are given.
+     */
+    async probeRemotes(remoteNames: string[] = [], timeoutSeconds?: number): Promise<Record<string, CloudSyncRemoteProbe> | false> {
+        const args = ['--probe'];
+        for (const remoteName of remoteNames) {
+            args.push('--remote', remoteName);
+        }
+        if (timeoutSeconds !== undefined) {
+            args.push('--timeout', timeoutSeconds.toString());
+        }
+        try {
+            const state = useSpawn(['/usr/bin/env', 'python3', '-c', get_cloud_sync_remotes_script, ...args], { superuser: 'try' });
+            const probeOutput = (await state.promise()).stdout!;
+            return JSON.parse(probeOutput).probes as Record<string, CloudSyncRemoteProbe>;
+        } catch (error) {
+            console.error("Error probing remotes:", error);
+            return false;
+        }
+    }
+
     async getRemoteByName(remoteName: string): Promise<CloudSyncRemote | null> {
         // await this.getRemotes();  // Ensure remotes are loaded
 
@@ -145,7 +176,8 @@ export class RemoteManager implements RemoteManagerType {
             this.cloudSyncRemotes.push(remote);
 
         } catch (error) {
-            console.error("Error fetching remotes:", error);
+            console.error("Error creating remote:", error);
+            throw error;
         }
 
         return remote;
@@ -193,17 +225,40 @@ export class RemoteManager implements RemoteManagerType {
             }
         } catch (error) {
             console.error("Error editing remote:", error);
+            throw error;
         }
 
         return remote;
     }
 
+    /**
+     * Delete many remotes with one locked rewrite of rclone.conf instead of one
+     * rewrite per remote.
+     */
+    async deleteRemotes(remoteNames: string[]) {
+        if (remoteNames.length === 0) {
+            return true;
+        }
+        try {
+            const state = useSpawn(['/usr/bin/env', 'python3', '-c', delete_cloud_sync_remote_script, ...remoteNames], { superuser: 'try' });
+            const deleteOutput = (await state.promise()).stdout;
+
+           console.log("Delete script output:", deleteOutput);
+        } catch (error) {
+            console.error("Error deleting remotes:", error);
+            return false;
+        }
+
+        // Remove the remotes from the list
+        const deleted = new Set(remoteNames);
+        const remaining = this.cloudSyncRemotes.filter(r => !deleted.has(r.name));
+        this.cloudSyncRemotes.splice(0, this.cloudSyncRemotes.length, ...remaining);
+        return true;
+    }
+
     async deleteRemote(remoteName: string) {
-        // Remove the remote from the list
         const index = this.cloudSyncRemotes.findIndex(r => r.name === remoteName);
-        if (index !== -1) {
-            this.cloudSyncRemotes.splice(index, 1);
-        } else {
+        if (index === -1) {
             console.error("Remote not found in the array:", remoteName);
             return false;
         }
@@ -214,11 +269,15 @@ export class RemoteManager implements RemoteManagerType {
             const deleteOutput = (await state.promise()).stdout;
 
            console.log("Delete script output:", deleteOutput);
-            return true;
         } catch (error) {
             console.error("Error deleting remote:", error);
             return false;
         }
+
+        // Remove the remote from the list once it is gone from the config
+        const remaining = this.cloudSyncRemotes.filter(r => r.name !== remoteName);
+        this.cloudSyncRemotes.splice(0, this.cloudSyncRemotes.length, ...remaining);
+        return true;
     }
 
 }
\ No newline at end of file
@@ -3,7 +3,8 @@ import { legacy, File, server, Command, unwrap, ValueError } from '@/index';
 import {
     SchedulerType,
     TaskInstanceType,
-    TaskTemplateType
+    TaskTemplateType,
+    TaskUnitStatus
 } from './types';
 import {
     TaskInstance,
@@ -29,6 +30,7 @@ import {
     createTaskFiles,
     createScheduleForTask,
     removeTask,
+    removeTasks,
     runTask,
     formatTemplateName
 } from './utils/helpers';
@@ -47,9 +49,30 @@ function validateTaskName(name: string): void {
     }
 }
 
+interface TaskData {
+    template: string;
+    parameters: any;
+    notes: string;
+    schedule: { intervals: any[]; enabled: boolean };
+    name: string;
+}
+
+/** get-task-instances.py --since output */
+interface TaskIndexData {
+    tasks: TaskData[];
+    removed: Array<{ name: string; template: string }>;
+    generated: number;
+    /** present with --with-status, for every task whether changed or not */
+    statuses?: Record<string, TaskUnitStatus>;
+}
+
 export class Scheduler implements SchedulerType {
     taskTemplates: TaskTemplateType[];
     taskInstances: TaskInstanceType[];
+    /** "generated" timestamp of the task index as of the last load/refresh */
+    taskIndexGenerated: number | null = null;
+    /** unit state per `${template}_${name}`, filled by load/refresh with withStatus */
+    taskStatuses: Record<string, TaskUnitStatus> = {};
 
     constructor(
         taskTemplates: TaskTemplateType[],
@@ -75,54 +98,15 @@ export class Scheduler implements SchedulerType {
         }
     }
 
-    async loadTaskInstances(): Promise<void>  {
+    async loadTaskInstances(withStatus: boolean = false): Promise<void>  {
         this.taskInstances.splice(0, this.taskInstances.length);
         try {
-            const state = useSpawn(['/usr/bin/env', 'python3', '-c', get_tasks_script], { superuser: 'try' });
-            const tasksOutput = (await state.promise()).stdout!;
-            // console.log('Raw tasksOutput:', tasksOutput);
-            const tasksData = JSON.parse(tasksOutput) as Array<{
-                template: string;
-                parameters: any;
-                notes: string;
-                schedule: { intervals: any[]; enabled: boolean };
-                name: string;
-            }>;
-            tasksData.forEach((task) => {
-                const newTaskTemplate = ref();
-                if (task.template == 'ZfsReplicationTask') {
-                    newTaskTemplate.value = new ZFSReplicationTaskTemplate;
-                } else if (task.template == 'AutomatedSnapshotTask') {
-                    newTaskTemplate.value = new AutomatedSnapshotTaskTemplate;
-                } else if (task.template == 'RsyncTask') {
-                    newTaskTemplate.value = new RsyncTaskTemplate;
-                } else if (task.template == 'ScrubTask') {
-                    newTaskTemplate.value = new ScrubTaskTemplate;
-                } else if (task.template == 'SmartTest') {
-                    newTaskTemplate.value = new SmartTestTemplate;
-                } else if (task.template == 'CloudSyncTask') {
-                    newTaskTemplate.value = new CloudSyncTaskTemplate;
-                } else if (task.template == 'CustomTask') {
-                    newTaskTemplate.value = new CustomTaskTemplate;
-                }
-
-                const parameters = task.parameters;
-                // console.log("SCHEDULER - Parameters before parsing:", parameters);
-
-                const parameterNodeStructure = this.createParameterNodeFromSchema(newTaskTemplate.value.parameterSchema, parameters);
-                const taskIntervals: TaskScheduleInterval[] = [];
-                const notes = task.notes;
-
-                task.schedule.intervals.forEach(interval => {
-                    const thisInterval = new TaskScheduleInterval(interval);
-                    taskIntervals.push(thisInterval);
-                });
-                const newSchedule = new TaskSchedule(task.schedule.enabled, taskIntervals);
-                const newTaskInstance = new TaskInstance(task.name, newTaskTemplate.value, parameterNodeStructure, newSchedule,notes); 
-                // console.log("SCHEDULER - TaskInstance:", newTaskInstance);
-
-                this.taskInstances.push(newTaskInstance);
+            const tasksData = await this.fetchTaskData(0, withStatus);
+            tasksData.tasks.forEach((task) => {
+                this.taskInstances.push(this.createTaskInstanceFromData(task));
             });
+            this.taskIndexGenerated = tasksData.generated;
+            this.taskStatuses = tasksData.statuses ?? {};
 
             // console.log('this.taskInstances:', this.taskInstances);
 
@@ -132,6 +116,86 @@ export class Scheduler implements SchedulerType {
         }
     }
 
+    /** Only re-read tasks that were added, changed or removed since the last load/refresh */
+    async refreshTaskInstances(withStatus: boolean = false): Promise<void> {
+        if (this.taskIndexGenerated === null) {
+            return this.loadTaskInstances(withStatus);
+        }
+        try {
+            const tasksData = await this.fetchTaskData(this.taskIndexGenerated, withStatus);
+            const stale = new Set([
+                ...tasksData.tasks.map((task) => `${task.template}_${task.name}`),
+                ...tasksData.removed.map((task) => `${task.template}_${task.name}`),
+            ]);
+            for (let i = this.taskInstances.length - 1; i >= 0; i--) {
+                const instance = this.taskInstances[i]!;
+                if (stale.has(`${formatTemplateName(instance.template.name)}_${instance.name}`)) {
+                    this.taskInstances.splice(i, 1);
+                }
+            }
+            tasksData.tasks.forEach((task) => {
+                this.taskInstances.push(this.createTaskInstanceFromData(task));
+            });
+            this.taskIndexGenerated = tasksData.generated;
+            this.taskStatuses = tasksData.statuses ?? {};
+        } catch (err: unknown) {
+            console.error(errorString(err));
+            return;
+        }
+    }
+
+    /** State of the task's service/timer as of the last load/refresh with withStatus */
+    getTaskUnitStatus(taskInstance: TaskInstanceType): TaskUnitStatus | undefined {
+        return this.taskStatuses[`${formatTemplateName(taskInstance.template.name)}_${taskInstance.name}`];
+    }
+
+    private async fetchTaskData(since: number, withStatus: boolean = false): Promise<TaskIndexData> {
+        const args = ['--since', since.toString()];
+        if (withStatus) {
+            args.push('--with-status');
+        }
+        const state = useSpawn(['/usr/bin/env', 'python3', '-c', get_tasks_script, ...args], { superuser: 'try' });
+        const tasksOutput = (await state.promise()).stdout!;
+        // console.log('Raw tasksOutput:', tasksOutput);
+        return JSON.parse(tasksOutput) as TaskIndexData;
+    }
+
+    private createTaskInstanceFromData(task: TaskData): TaskInstance {
+        const newTaskTemplate = ref();
+        if (task.template == 'ZfsReplicationTask') {
+            newTaskTemplate.value = new ZFSReplicationTaskTemplate;
+        } else if (task.template == 'AutomatedSnapshotTask') {
+            newTaskTemplate.value = new AutomatedSnapshotTaskTemplate;
+        } else if (task.template == 'RsyncTask') {
+            newTaskTemplate.value = new RsyncTaskTemplate;
+        } else if (task.template == 'ScrubTask') {
+            newTaskTemplate.value = new ScrubTaskTemplate;
+        } else if (task.template == 'SmartTest') {
+            newTaskTemplate.value = new SmartTestTemplate;
+        } else if (task.template == 'CloudSyncTask') {
+            newTaskTemplate.value = new CloudSyncTaskTemplate;
+        } else if (task.template == 'CustomTask') {
+            newTaskTemplate.value = new CustomTaskTemplate;
+        }
+
+        const parameters = task.parameters;
+        // console.log("SCHEDULER - Parameters before parsing:", parameters);
+
+        const parameterNodeStructure = this.createParameterNodeFromSchema(newTaskTemplate.value.parameterSchema, parameters);
+        const taskIntervals: TaskScheduleInterval[] = [];
+        const notes = task.notes;
+
+        task.schedule.intervals.forEach(interval => {
+            const thisInterval = new TaskScheduleInterval(interval);
+            taskIntervals.push(thisInterval);
+        });
+        const newSchedule = new TaskSchedule(task.schedule.enabled, taskIntervals);
+        const newTaskInstance = new TaskInstance(task.name, newTaskTemplate.value, parameterNodeStructure, newSchedule,notes); 
+        // console.log("SCHEDULER - TaskInstance:", newTaskInstance);
+
+        return newTaskInstance;
+    }
+
     // Main function to create a ParameterNode from JSON parameters based on a schema
     createParameterNodeFromSchema(schema: ParameterNode, parameters: any): ParameterNode {
         function cloneSchema(node: ParameterNode): ParameterNode {
@@ -442,12 +506,8 @@ export class Scheduler implements SchedulerType {
                 err => console.error(` update env failed:`, err)
             );
 
+        // reloads systemd itself, and only if the .service actually changed
         await createStandaloneTask(templateName, scriptPath, envFilePath);
-
-        // Reload the system daemon
-        let command = ['sudo', 'systemctl', 'daemon-reload'];
-        let state = useSpawn(command, { superuser: 'try' });
-        await state.promise();
     }
 
     async updateTaskNotes(taskInstance: TaskInstance) {
@@ -682,32 +742,27 @@ export class Scheduler implements SchedulerType {
             );
 
         if (taskInstance.schedule.enabled) {
+            // reloads systemd and restarts the timer only if the .timer actually changed
             await createScheduleForTask(fullTaskName, templateTimerPath, jsonFilePath);
-
-            // Reload the system daemon
-            let command = ['sudo', 'systemctl', 'daemon-reload'];
-            let state = useSpawn(command, { superuser: 'try' });
-            await state.promise();
-
-            command = ['sudo', 'systemctl', 'restart', fullTaskName + '.timer'];
-            state = useSpawn(command, { superuser: 'try' });
-            await state.promise();
         }
     }
 
     /**
-     * Batch delete multiple tasks. Sequentially stops and unregisters each task,
-     * collecting results. Continues on individual failures.
+     * Batch delete multiple tasks. Stops, disables and removes all of them with
+     * a single remove-task-files.py call, collecting per-task results.
+     * Continues on individual failures.
      */
     async batchDeleteTasks(
         tasks: TaskInstanceType[]
     ): Promise<{ deleted: string[]; errors: { task: string; error: string }[] }> {
         const result = { deleted: [] as string[], errors: [] as { task: string; error: string }[] };
 
+        const tasksByUnit = new Map<string, TaskInstanceType>();
         for (const task of tasks) {
             try {
-                await this.unregisterTaskInstance(task);
-                result.deleted.push(task.name);
+                validateTaskName(task.name);
+                const templateName = formatTemplateName(task.template.name);
+                tasksByUnit.set(`houston_scheduler_${templateName}_${task.name}`, task);
             } catch (e: any) {
                 result.errors.push({
                     task: task.name,
@@ -715,6 +770,19 @@ export class Scheduler implements SchedulerType {
                 });
             }
         }
+        if (tasksByUnit.size === 0) {
+            return result;
+        }
+
+        const removal = await removeTasks([...tasksByUnit.keys()]);
+        if (!removal) {
+            tasksByUnit.forEach((task) => result.errors.push({ task: task.name, error: 'remove-task-files.py failed' }));
+            return result;
+        }
+        removal.removed.forEach((unit) => result.deleted.push(tasksByUnit.get(unit)!.name));
+        Object.entries(removal.errors).forEach(([unit, error]) =>
+            result.errors.push({ task: tasksByUnit.get(unit)?.name ?? unit, error })
+        );
 
         return result;
     }
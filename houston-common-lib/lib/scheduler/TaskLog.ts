@@ -1,6 +1,11 @@
-import { legacy } from '@/index';
+import { legacy, server, PythonCommand } from '@/index';
 import { formatTemplateName } from './utils/helpers';
-import { TaskInstanceType } from './types';
+import { TaskInstanceType, TaskLogEntry, TaskLogPage, TaskRunHistory } from './types';
+
+// @ts-ignore
+import get_task_log_script from '@/scripts/get-task-log.py?raw';
+// @ts-ignore
+import task_history_script from '@/scripts/task-history.py?raw';
 
 const { useSpawn, errorString } = legacy;
 
@@ -74,9 +79,129 @@ export class TaskExecutionLog {
         }
     }
 
+    /**
+     * One page of a task's journal as structured entries. Without cursors this is
+     * the newest `limit` entries; pass `lastCursor` as afterCursor to fetch only new
+     * lines, or `firstCursor` as beforeCursor to page backwards.
+     */
+    async getLogPage(
+        taskInstance: TaskInstanceType,
+        opts: { afterCursor?: string; beforeCursor?: string; limit?: number; invocation?: string; since?: string } = {}
+    ): Promise<TaskLogPage | false> {
+        const args = [this.getUnitName(taskInstance)];
+        if (opts.afterCursor) args.push('--after-cursor', opts.afterCursor);
+        if (opts.beforeCursor) args.push('--before-cursor', opts.beforeCursor);
+        if (opts.limit !== undefined) args.push('--limit', opts.limit.toString());
+        if (opts.invocation) args.push('--invocation', opts.invocation);
+        if (opts.since) args.push('--since', opts.since);
+
+        const result = await server
+            .execute(new PythonCommand(get_task_log_script, args, { superuser: 'try' }));
+        if (result.isErr()) {
+            console.error(errorString(result.error));
+            return false;
+        }
+        try {
+            return JSON.parse(result.value.getStdout()) as TaskLogPage;
+        } catch (error) {
+            console.error(errorString(error));
+            return false;
+        }
+    }
+
+    /**
+     * Stream new journal entries of a task as they are written, starting after
+     * afterCursor (or from now). With untilInactive the stream ends by itself once
+     * the task's service stops running.
+     */
+    followLog(
+        taskInstance: TaskInstanceType,
+        onEntry: (entry: TaskLogEntry) => void,
+        opts: { afterCursor?: string; untilInactive?: boolean; onEnd?: () => void } = {}
+    ): { stop: () => void } {
+        const args = [this.getUnitName(taskInstance), '--follow'];
+        if (opts.afterCursor) args.push('--after-cursor', opts.afterCursor);
+        if (opts.untilInactive) args.push('--until-inactive');
+
+        const proc = server.spawnProcess(new PythonCommand(get_task_log_script, args, { superuser: 'try' }), true);
+        proc.execute();
+        let buffer = '';
+        proc.stream((output) => {
+            // a chunk may hold several newline-delimited messages, or only part of one
+            const lines = (buffer + output).split('\n');
+            buffer = lines.pop() ?? '';
+            for (const line of lines) {
+                if (!line.trim()) {
+                    continue;
+                }
+                try {
+                    const { type, ...entry } = JSON.parse(line);
+                    if (type === 'entry') {
+                        onEntry(entry as TaskLogEntry);
+                    }
+                } catch (error) {
+                    console.error(errorString(error));
+                }
+            }
+        });
+        proc.wait().match(
+            () => opts.onEnd?.(),
+            (error) => {
+                console.error(errorString(error));
+                opts.onEnd?.();
+            }
+        );
+
+        return {
+            stop: () => proc.terminate(),
+        };
+    }
+
+    /**
+     * Run history with duration and throughput percentiles, for the given tasks or
+     * every task that has run. New journal entries are folded into the history
+     * store first, so only what was logged since the last call is read.
+     */
+    async getHistory(
+        taskInstances: TaskInstanceType[] = [],
+        opts: { limit?: number; window?: number } = {}
+    ): Promise<TaskRunHistory[] | false> {
+        const args = taskInstances.map((taskInstance) => this.getUnitName(taskInstance));
+        if (opts.limit !== undefined) args.push('--limit', opts.limit.toString());
+        if (opts.window !== undefined) args.push('--window', opts.window.toString());
+
+        const result = await server
+            .execute(new PythonCommand(task_history_script, args, { superuser: 'try' }));
+        if (result.isErr()) {
+            console.error(errorString(result.error));
+            return false;
+        }
+        try {
+            return JSON.parse(result.value.getStdout()).tasks as TaskRunHistory[];
+        } catch (error) {
+            console.error(errorString(error));
+            return false;
+        }
+    }
+
+    private getUnitName(taskInstance: TaskInstanceType) {
+        return `houston_scheduler_${formatTemplateName(taskInstance.template.name)}_${taskInstance.name}`;
+    }
+
     async wasTaskRecentlyCompleted(taskInstance: TaskInstanceType): Promise<boolean> {
         const taskLog = new TaskExecutionLog([]);
 
+        // Define a threshold for "recently completed" (e.g., 10 minutes in milliseconds)
+        const threshold = 10 * 60 * 1000;
+        const currentTime = Date.now();
+
+        // The history store answers this without querying systemd and the journal again
+        const history = await taskLog.getHistory([taskInstance], { limit: 1, window: 1 });
+        const lastRun = history ? history[0]?.runs[0] : undefined;
+        if (lastRun) {
+            return lastRun.end !== null && (currentTime - lastRun.end / 1000) <= threshold;
+        }
+
         // Get the latest entry for the task
         const latestEntry = await taskLog.getLatestEntryFor(taskInstance);
 
@@ -85,10 +210,6 @@ export class TaskExecutionLog {
         }
 
         const finishDate = new Date(latestEntry.finishDate).getTime();
-        const currentTime = Date.now();
-
-        // Define a threshold for "recently completed" (e.g., 10 minutes in milliseconds)
-        const threshold = 10 * 60 * 1000;
 
         // Check if the task finished within the threshold
         return (currentTime - finishDate) <= threshold;
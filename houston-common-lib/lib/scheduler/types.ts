@@ -39,7 +39,8 @@ export interface SchedulerType {
     taskTemplates: TaskTemplateType[];
     taskInstances: TaskInstanceType[];
 
-    loadTaskInstances(): Promise<void>;
+    loadTaskInstances(withStatus?: boolean): Promise<void>;
+    refreshTaskInstances(withStatus?: boolean): Promise<void>;
     createParameterNodeFromSchema(schema: ParameterNodeType, parameters: any): ParameterNodeType;
     registerTaskInstance(taskInstance: TaskInstanceType): Promise<void>;
     updateTaskInstance(taskInstance: TaskInstanceType): Promise<void>;
@@ -193,6 +194,215 @@ export interface DiskDetails {
     diskPath: string;
 }
 
+/** systemd state of a task's units as reported by `systemctl show` (values are unparsed, "" when unset) */
+export interface TaskUnitStatus {
+    service: {
+        ActiveState: string;
+        SubState: string;
+        Result: string;
+        ExecMainStatus: string;
+        ExecMainStartTimestamp: string;
+        ExecMainExitTimestamp: string;
+    };
+    timer: {
+        ActiveState: string;
+        SubState: string;
+        NextElapseUSecRealtime: string;
+        LastTriggerUSec: string;
+    };
+}
+
+/** What rendering did to a unit file; unchanged files are not rewritten, reloaded or restarted */
+export type UnitFileStatus = "unchanged" | "created" | "updated";
+
+/** One task of a task-file-creation.py batch; field names match the script's long options */
+export interface TaskFilesManifestEntry {
+    templateName?: string;
+    scriptPath?: string;
+    /** .env path, renders the .service when given */
+    env?: string;
+    timerTemplate?: string;
+    /** schedule .json path, renders the .timer when given */
+    schedule?: string;
+    /** full unit name, only needed for schedule-only entries */
+    name?: string;
+}
+
+export interface TaskFilesBatchResult {
+    success: boolean;
+    tasks: Array<{
+        name: string | null;
+        success: boolean;
+        units: Record<string, UnitFileStatus>;
+        /** template placeholders no value was given for, per unit */
+        unfilled: Record<string, string[]>;
+        error: string | null;
+    }>;
+    error?: string;
+}
+
+export interface TaskLogEntry {
+    /** journal cursor of this entry, for afterCursor/beforeCursor */
+    cursor: string;
+    /** microseconds since the epoch */
+    timestamp: number;
+    message: string;
+    /** syslog priority, 0 (emerg) to 7 (debug) */
+    priority: number | null;
+    pid: string | null;
+    /** systemd InvocationID of the run that wrote it */
+    invocationId: string | null;
+}
+
+/** get-task-log.py output, entries oldest first */
+export interface TaskLogPage {
+    entries: TaskLogEntry[];
+    /** cursor to page backwards from */
+    firstCursor: string | null;
+    /** cursor to fetch newer entries after */
+    lastCursor: string | null;
+    /** more entries exist in the direction that was read */
+    hasMore: boolean;
+}
+
+export interface TaskRunRecord {
+    /** systemd InvocationID, also usable as getLogPage's invocation */
+    invocationId: string;
+    /** microseconds since the epoch */
+    start: number | null;
+    end: number | null;
+    /** seconds, null while still running */
+    duration: number | null;
+    exitCode: number | null;
+    /** 'success', or systemd's failure reason such as 'exit-code' or 'timeout' */
+    result: string | null;
+    /** parsed from rsync, rclone or mbuffer output */
+    bytesTransferred: number | null;
+    ioReadBytes: number | null;
+    ioWriteBytes: number | null;
+}
+
+/** Per-task entry of task-history.py output; percentiles cover the last `window` finished runs */
+export interface TaskRunHistory {
+    unit: string;
+    template: string;
+    name: string;
+    /** most recent first */
+    runs: TaskRunRecord[];
+    finishedRuns: number;
+    successRate: number | null;
+    /** seconds */
+    durationP50: number | null;
+    durationP95: number | null;
+    /** bytes per second */
+    throughputP50: number | null;
+    throughputP95: number | null;
+}
+
+/** ssh-session.py output */
+export interface SshSessionStatus {
+    success: boolean;
+    /** whether a shared connection is up after the action */
+    active: boolean;
+    error: string | null;
+}
+
+/** test-netcat.py output */
+export interface NetcatProbeResult {
+    success: boolean;
+    reachable: boolean;
+    host: string;
+    port: number;
+    /** TCP handshake time of the connection that succeeded */
+    rttMs: number | null;
+    attempts: number;
+    /** null when not sampled or not connected */
+    throughput: {
+        bytes: number;
+        seconds: number;
+        bytesPerSecond: number | null;
+    } | null;
+    error: string | null;
+}
+
+interface TargetCheck {
+    success: boolean;
+    /** null when skipped */
+    ms: number | null;
+    error: string | null;
+}
+
+/** validate-targets.py output */
+export interface TargetValidationReport {
+    success: boolean;
+    /** wall time of the whole validation */
+    ms: number;
+    error?: string;
+    targets: Array<{
+        host: string;
+        user: string;
+        port: string;
+        success: boolean;
+        ms: number;
+        ssh: TargetCheck;
+        pools: TargetCheck & { data: string[] };
+        /** only when a netcatPort was given */
+        netcat?: TargetCheck & Omit<NetcatProbeResult, 'success' | 'host' | 'port' | 'error'>;
+        error?: string;
+    }>;
+}
+
+/** remove-task-files.py output; errors are keyed by full unit name */
+export interface BulkTaskRemoveResult {
+    success: boolean;
+    removed: string[];
+    errors: Record<string, string>;
+}
+
+/** run-task-now.py output; errors are keyed by full unit name */
+export interface BulkTaskRunResult {
+    success: boolean;
+    started: string[];
+    errors: Record<string, string>;
+}
+
+/** schedule-forecast.py output; times are local ISO 8601 without offset, like systemd's OnCalendar */
+export interface ScheduleForecast {
+    success: true;
+    generated: string;
+    until: string;
+    tasks: Array<{
+        name: string;
+        template: string;
+        enabled: boolean;
+        /** OnCalendar= value per interval */
+        onCalendar: string[];
+        next: string[];
+        /** set when an interval is invalid, in which case nothing is forecast */
+        error: string | null;
+    }>;
+    /** heavy tasks due to start within one window of each other */
+    contention: Array<{
+        start: string;
+        end: string;
+        tasks: Array<{ name: string; template: string }>;
+    }>;
+}
+
+export interface ZfsDatasetNode {
+    name: string;
+    /** count of snapshots of this dataset, only present when requested */
+    snapshots?: number;
+    /** requested properties, numeric values in exact bytes, null when unset ("-") */
+    [property: string]: string | number | null | undefined;
+}
+
+export interface ZfsPoolTree {
+    name: string;
+    /** the pool's root dataset followed by its descendants, in `zfs list` order */
+    datasets: ZfsDatasetNode[];
+}
+
 /**
  * Configuration for a cloud sync remote
  */
@@ -221,6 +431,17 @@ export interface CloudSyncParameterType {
     defaultValue?: string | number | boolean | object;
 }
 
+/** get-rclone-remotes.py --probe result of one remote */
+export interface CloudSyncRemoteProbe {
+    reachable: boolean;
+    ms: number;
+    /** 'lsd' when the backend doesn't support `rclone about` */
+    method: 'about' | 'lsd';
+    /** `rclone about --json` output, in bytes */
+    quota: { total?: number; used?: number; free?: number; trashed?: number; other?: number; objects?: number } | null;
+    error: string | null;
+}
+
 /**
  * Manager for cloud sync remotes
  */
@@ -229,6 +450,7 @@ export interface RemoteManagerType {
 
     getRemotes(): Promise<void>;
     getRemoteByName(remoteName: string): Promise<CloudSyncRemoteType | null>;
+    probeRemotes(remoteNames?: string[], timeoutSeconds?: number): Promise<Record<string, CloudSyncRemoteProbe> | false>;
     createRemote(
         label: string,
         key: string,
@@ -244,4 +466,5 @@ export interface RemoteManagerType {
         parameters: any
     ): Promise<CloudSyncRemoteType>;
     deleteRemote(key: string): Promise<boolean>;
+    deleteRemotes(keys: string[]): Promise<boolean>;
 }
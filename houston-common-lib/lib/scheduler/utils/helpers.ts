@@ -1,24 +1,48 @@
-import { legacy } from "@/index";
+import { legacy, server, PythonCommand } from "@/index";
 // @ts-ignore
-import get_zfs_data_script from "@/scripts/get-zfs-data.py?raw";
+import get_zfs_data_script_body from "@/scripts/get-zfs-data.py?raw";
 // @ts-ignore
-import test_ssh_script from "@/scripts/test-ssh.py?raw";
+import test_ssh_script_body from "@/scripts/test-ssh.py?raw";
 // @ts-ignore
-import test_netcat_script from '@/scripts/test-netcat.py?raw'
+import test_netcat_script_body from '@/scripts/test-netcat.py?raw'
 //@ts-ignore
-import task_file_creation_script from "@/scripts/task-file-creation.py?raw";
+import ssh_session_module from "@/scripts/ssh_session.py?raw";
 //@ts-ignore
-import remove_task_script from "@/scripts/remove-task-files.py?raw";
+import ssh_session_script_body from "@/scripts/ssh-session.py?raw";
+//@ts-ignore
+import net_probe_module from "@/scripts/net_probe.py?raw";
+//@ts-ignore
+import validate_targets_script_body from "@/scripts/validate-targets.py?raw";
+//@ts-ignore
+import task_file_creation_script_body from "@/scripts/task-file-creation.py?raw";
+//@ts-ignore
+import task_schedule_module from "@/scripts/task_schedule.py?raw";
+//@ts-ignore
+import schedule_forecast_script_body from "@/scripts/schedule-forecast.py?raw";
+//@ts-ignore
+import remove_task_script_body from "@/scripts/remove-task-files.py?raw";
+//@ts-ignore
+import systemd_units_module from "@/scripts/systemd_units.py?raw";
 //@ts-ignore
 import run_task_script from "@/scripts/run-task-now.py?raw";
 //@ts-ignore
 import get_disks_script from "@/scripts/get-disk-data.py?raw";
 
 import { inject, InjectionKey, ref } from "vue";
-import { DiskData } from "../types";
+import { DiskData, ZfsPoolTree, TaskFilesManifestEntry, TaskFilesBatchResult, ScheduleForecast, BulkTaskRemoveResult, BulkTaskRunResult, SshSessionStatus, NetcatProbeResult, TargetValidationReport } from "../types";
 
 const { useSpawn, errorString } = legacy;
 
+// scripts run via `python3 -c` can't import each other, so shared modules are prepended
+const task_file_creation_script = `${task_schedule_module}\n${systemd_units_module}\n${task_file_creation_script_body}`;
+const remove_task_script = `${systemd_units_module}\n${remove_task_script_body}`;
+const schedule_forecast_script = `${task_schedule_module}\n${schedule_forecast_script_body}`;
+const get_zfs_data_script = `${ssh_session_module}\n${get_zfs_data_script_body}`;
+const test_ssh_script = `${ssh_session_module}\n${test_ssh_script_body}`;
+const test_netcat_script = `${ssh_session_module}\n${net_probe_module}\n${test_netcat_script_body}`;
+const ssh_session_script = `${ssh_session_module}\n${ssh_session_script_body}`;
+const validate_targets_script = `${ssh_session_module}\n${net_probe_module}\n${validate_targets_script_body}`;
+
 /**
  * Validate SSH-related parameters to prevent injection via crafted values.
  * Rejects values containing shell metacharacters or SSH option flags.
@@ -190,6 +214,65 @@ export async function getDatasetData(
   }
 }
 
+/* Every pool with its datasets (and optional properties/snapshot counts) in one call */
+export async function getPoolTree(
+	host?: string,
+	port?: string | number,
+	user?: string,
+	properties: string[] = [],
+	snapshots: boolean = false): Promise<ZfsPoolTree[] | null> {
+  try {
+	if (host) validateSshParam(host, "host");
+	if (user) validateSshParam(user, "user");
+	if (port) validatePort(port);
+	const cmd = [
+	  "/usr/bin/env",
+	  "python3",
+	  "-c",
+	  get_zfs_data_script,
+	  "-t",
+	  "tree",
+	];
+	if (properties.length > 0) {
+	  cmd.push("--properties");
+	  cmd.push(properties.join(","));
+	}
+	if (snapshots) {
+	  cmd.push("--snapshots");
+	}
+	if (host) {
+	  cmd.push("--host");
+	  cmd.push(host);
+	}
+	if (port) {
+	  cmd.push("--port");
+	  cmd.push(port.toString());
+	}
+	if (user) {
+	  cmd.push("--user");
+	  cmd.push(user);
+	}
+
+	const state = useSpawn(cmd, { superuser: "try" });
+
+	try {
+	  const result = (await state.promise()).stdout!;
+	  const parsedResult = JSON.parse(result);
+	  if (parsedResult.success) {
+		return parsedResult.data;
+	  } else if (parsedResult.error) {
+		console.error("Script error:", parsedResult.error);
+	  }
+	  return [];
+	} catch (error) {
+	  return [];
+	}
+  } catch (state) {
+	console.error(errorString(state));
+	return null;
+  }
+}
+
 export async function testSSH(sshTarget: string) {
   try {
     validateSshParam(sshTarget, "SSH target");
@@ -212,34 +295,134 @@ export async function testSSH(sshTarget: string) {
   }
 }
 
+/**
+ * Start a one-shot nc listener on netcatHost over ssh and connect to it, retrying
+ * with backoff until it accepts. Resolves to the connection's RTT and a short
+ * throughput sample, or why it could not connect.
+ */
+export async function probeNetcat(
+	user: string,
+	netcatHost: string,
+	port: any,
+	opts: { timeout?: number; retries?: number; sampleBytes?: number } = {}
+): Promise<NetcatProbeResult> {
+  const failed = (error: string): NetcatProbeResult => ({
+	success: false, reachable: false, host: netcatHost, port: Number(port),
+	rttMs: null, attempts: 0, throughput: null, error,
+  });
+  try {
+	validateSshParam(user, "user");
+	validateSshParam(netcatHost, "host");
+	validatePort(port);
+  } catch (error) {
+	return failed(errorString(error));
+  }
+  const args = [user, netcatHost, port.toString()];
+  if (opts.timeout !== undefined) args.push("--timeout", opts.timeout.toString());
+  if (opts.retries !== undefined) args.push("--retries", opts.retries.toString());
+  if (opts.sampleBytes !== undefined) args.push("--sample", opts.sampleBytes.toString());
+
+  // exits non-zero when the port is unreachable, the reason is on stdout
+  const result = await server
+	.spawnProcess(new PythonCommand(test_netcat_script, args, { superuser: "try" }))
+	.wait(false);
+  if (result.isErr()) {
+	return failed(errorString(result.error));
+  }
+  try {
+	return JSON.parse(result.value.getStdout()) as NetcatProbeResult;
+  } catch (error) {
+	return failed(errorString(error));
+  }
+}
+
 export async function testNetcat(user: string, netcatHost: string, port: any) {
-	try {
-	  validateSshParam(user, "user");
-	  validateSshParam(netcatHost, "host");
-	  validatePort(port);
-	  console.log(`target: ${netcatHost}, port: ${port}`);
-	  
-	  // Pass both hostname and port to the Python script
-	  const state = useSpawn(
-		["/usr/bin/env", "python3", "-c", test_netcat_script, user, netcatHost, port],
-		{ superuser: "try" }
-	  );
-  
-	  const output = await state.promise();
-	  console.log("testNetcat output:", output);
-  
-	  // Check for "Connected" in stdout to confirm a successful connection
-	  if (output.stdout!.includes("True")) {
-		return true;
-	  } else {
-		return false;
-	  }
-	} catch (error) {
-	  console.error(errorString(error));
-	  return false;
+  const result = await probeNetcat(user, netcatHost, port);
+  if (!result.success) {
+	console.error("testNetcat:", result.error);
+  }
+  return result.reachable;
+}
+
+/**
+ * Check ssh auth, remote pools and (with netcatPort) netcat reachability of many
+ * replication targets at once. Targets are checked concurrently, so this takes
+ * about as long as the slowest one.
+ */
+export async function validateTargets(
+	targets: Array<{ host: string; user?: string; port?: string | number; netcatPort?: string | number }>,
+	opts: { timeout?: number; sampleBytes?: number; jobs?: number } = {}
+): Promise<TargetValidationReport | false> {
+  try {
+	for (const target of targets) {
+	  validateSshParam(target.host, "host");
+	  if (target.user) validateSshParam(target.user, "user");
+	  if (target.port) validatePort(target.port);
+	  if (target.netcatPort) validatePort(target.netcatPort);
 	}
+  } catch (error) {
+	console.error(errorString(error));
+	return false;
   }
-  
+  const args = ["--targets", "-"];
+  if (opts.timeout !== undefined) args.push("--timeout", opts.timeout.toString());
+  if (opts.sampleBytes !== undefined) args.push("--sample", opts.sampleBytes.toString());
+  if (opts.jobs !== undefined) args.push("--jobs", opts.jobs.toString());
+
+  const proc = server.spawnProcess(
+	new PythonCommand(validate_targets_script, args, { superuser: "try" })
+  );
+  proc.write(JSON.stringify(targets), false);
+  // exits zero even when targets fail validation, the report says which
+  const result = await proc.wait(false);
+  if (result.isErr()) {
+	console.error(result.error);
+	return false;
+  }
+  try {
+	return JSON.parse(result.value.getStdout()) as TargetValidationReport;
+  } catch (error) {
+	console.error(errorString(error));
+	return false;
+  }
+}
+
+/**
+ * Open, close or check the shared SSH connection to user@host:port that the
+ * remote ZFS queries and connection tests reuse. Opening it when a target is
+ * picked saves those calls the handshake; an idle session closes by itself.
+ */
+export async function sshSession(
+	action: "open" | "close" | "status",
+	host: string,
+	port?: string | number,
+	user?: string
+): Promise<SshSessionStatus> {
+  try {
+	validateSshParam(host, "host");
+	if (user) validateSshParam(user, "user");
+	if (port) validatePort(port);
+  } catch (error) {
+	return { success: false, active: false, error: errorString(error) };
+  }
+  const args = [action, host];
+  if (port) args.push("--port", port.toString());
+  if (user) args.push("--user", user);
+
+  // exits non-zero when the session could not be opened, the reason is on stdout
+  const result = await server
+	.spawnProcess(new PythonCommand(ssh_session_script, args, { superuser: "try" }))
+	.wait(false);
+  if (result.isErr()) {
+	return { success: false, active: false, error: errorString(result.error) };
+  }
+  try {
+	return JSON.parse(result.value.getStdout()) as SshSessionStatus;
+  } catch (error) {
+	return { success: false, active: false, error: errorString(error) };
+  }
+}
+
 export async function executePythonScript(
   script: string,
   args: string[]
@@ -316,6 +499,75 @@ export async function createScheduleForTask(
   ]);
 }
 
+/**
+ * Create the units of many tasks with a single daemon-reload and one
+ * enable/restart of all timers. Resolves to per-task results.
+ */
+export async function createTaskFilesBatch(
+	entries: TaskFilesManifestEntry[]
+): Promise<TaskFilesBatchResult | false> {
+  const proc = server.spawnProcess(
+	new PythonCommand(task_file_creation_script, ["-t", "batch", "-m", "-"], { superuser: "try" })
+  );
+  proc.write(JSON.stringify(entries), false);
+  // exits non-zero when any task failed, the per-task results are still on stdout
+  const result = await proc.wait(false);
+  if (result.isErr()) {
+	console.error(result.error);
+	return false;
+  }
+  try {
+	return JSON.parse(result.value.getStdout()) as TaskFilesBatchResult;
+  } catch (error) {
+	console.error(errorString(error));
+	return false;
+  }
+}
+
+/**
+ * Upcoming fire times of the installed tasks (or of `tasks`, e.g. unsaved edits),
+ * and windows where heavy tasks (scrub, replication) are due to start together.
+ */
+export async function getScheduleForecast(opts: {
+	tasks?: Array<{ name: string; template: string; schedule: { enabled: boolean; intervals: any[] } }>;
+	count?: number;
+	horizonHours?: number;
+	windowMinutes?: number;
+	maxConcurrent?: number;
+	heavyTemplates?: string[];
+} = {}): Promise<ScheduleForecast | false> {
+  const args: string[] = [];
+  if (opts.tasks) args.push("--tasks", "-");
+  if (opts.count !== undefined) args.push("--count", opts.count.toString());
+  if (opts.horizonHours !== undefined) args.push("--horizon", opts.horizonHours.toString());
+  if (opts.windowMinutes !== undefined) args.push("--window", opts.windowMinutes.toString());
+  if (opts.maxConcurrent !== undefined) args.push("--max-concurrent", opts.maxConcurrent.toString());
+  if (opts.heavyTemplates) args.push("--heavy", opts.heavyTemplates.join(","));
+
+  const proc = server.spawnProcess(
+	new PythonCommand(schedule_forecast_script, args, { superuser: "try" })
+  );
+  if (opts.tasks) {
+	proc.write(JSON.stringify(opts.tasks), false);
+  }
+  const result = await proc.wait(false);
+  if (result.isErr()) {
+	console.error(result.error);
+	return false;
+  }
+  try {
+	const parsed = JSON.parse(result.value.getStdout());
+	if (!parsed.success) {
+	  console.error("Script error:", parsed.error);
+	  return false;
+	}
+	return parsed as ScheduleForecast;
+  } catch (error) {
+	console.error(errorString(error));
+	return false;
+  }
+}
+
 export async function removeTask(taskName: string) {
   return executePythonScript(remove_task_script, [taskName]);
 }
@@ -324,6 +576,33 @@ export async function runTask(taskName: string) {
   return executePythonScript(run_task_script, [taskName]);
 }
 
+async function runBulkTaskScript(script: string, taskNames: string[]): Promise<any | false> {
+  // both scripts exit non-zero when any task failed, the per-task results are still on stdout
+  const result = await server
+	.spawnProcess(new PythonCommand(script, taskNames, { superuser: "try" }))
+	.wait(false);
+  if (result.isErr()) {
+	console.error(result.error);
+	return false;
+  }
+  try {
+	return JSON.parse(result.value.getStdout());
+  } catch (error) {
+	console.error(errorString(error));
+	return false;
+  }
+}
+
+/** Stop, disable and delete many tasks (full unit names) with a single daemon-reload */
+export async function removeTasks(taskNames: string[]): Promise<BulkTaskRemoveResult | false> {
+  return runBulkTaskScript(remove_task_script, taskNames);
+}
+
+/** Start many tasks (full unit names) at once; resolves when all of them have started */
+export async function runTasks(taskNames: string[]): Promise<BulkTaskRunResult | false> {
+  return runBulkTaskScript(run_task_script, taskNames);
+}
+
 //change the first letter of a word to upper case
 export const upperCaseWord = (word: string) => {
   let lowerCaseWord = word.toLowerCase();
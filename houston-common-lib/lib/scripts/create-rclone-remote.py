@@ -1,51 +1,46 @@
 #!/usr/bin/env python3
+# edit_rclone_conf() and RCLONE_CONF_PATH come from scripts/rclone_conf_store.py,
+# which RemoteManager.ts prepends to this script.
+import sys
 import argparse
-import configparser
 import json
 
-RCLONE_CONF_PATH = '/root/.config/rclone/rclone.conf'
-
-def save_remote_to_conf(remote):
-    config = configparser.ConfigParser()
-    config.read(RCLONE_CONF_PATH)
-
-    name = remote["name"]
-    remote_type = remote["type"]
-    auth_params = remote["authParams"]
-
-    if config.has_section(name):
-        raise ValueError(f"Remote '{name}' already exists")
-
-    # Add new remote section
-    config.add_section(name)
-    config.set(name, 'type', remote_type)
-
-    for key, value in auth_params.items():
+def remote_values(remote):
+    values = {'type': remote["type"]}
+    for key, value in remote["authParams"].items():
         if isinstance(value, dict):
             # Convert dictionary to JSON string
             value = json.dumps(value)
         if value:  # Skip empty values
-            config.set(name, key, str(value))
+            values[key] = str(value)
+    return values
 
-    # Write changes to the config file in write mode to avoid duplication
-    with open(RCLONE_CONF_PATH, 'w') as configfile:
-        config.write(configfile)
+def save_remotes_to_conf(remotes, conf_path=RCLONE_CONF_PATH):
+    """Add every remote in one locked read-modify-write; if one of them can't be
+    added, none are"""
+    with edit_rclone_conf(conf_path) as conf:
+        for remote in remotes:
+            conf.add(remote["name"], remote_values(remote))
 
-    print(f"Remote '{name}' successfully created and saved to {RCLONE_CONF_PATH}")
+    for remote in remotes:
+        print(f"Remote '{remote['name']}' successfully created and saved to {conf_path}")
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Save a CloudSyncRemote to rclone.conf")
-    parser.add_argument('--data', type=str, required=True, help="JSON string of CloudSyncRemote data")
+    parser = argparse.ArgumentParser(description="Save CloudSyncRemotes to rclone.conf")
+    parser.add_argument('--data', type=str, required=True, help="JSON string of CloudSyncRemote data, or a list of them")
+    parser.add_argument('--config', type=str, default=RCLONE_CONF_PATH, help=f"rclone config file ({RCLONE_CONF_PATH} by default)")
 
     args = parser.parse_args()
     try:
         remote_data = json.loads(args.data)  # Parse JSON string to dictionary
-        save_remote_to_conf(remote_data)
-    except ValueError as e:
-        print(e)
+        save_remotes_to_conf(remote_data if isinstance(remote_data, list) else [remote_data], args.config)
     except json.JSONDecodeError:
-        print("Invalid JSON format for --data argument")
+        print("Invalid JSON format for --data argument", file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, OSError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
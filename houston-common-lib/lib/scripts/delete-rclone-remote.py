@@ -1,31 +1,27 @@
 #!/usr/bin/env python3
-import configparser
+# edit_rclone_conf() and RCLONE_CONF_PATH come from scripts/rclone_conf_store.py,
+# which RemoteManager.ts prepends to this script.
 import sys
-import os
 
-RCLONE_CONF_PATH = '/root/.config/rclone/rclone.conf'
+def delete_remotes(remote_names, conf_path=RCLONE_CONF_PATH):
+    """Remove the remotes in one locked read-modify-write; if one of them is not
+    found, none are removed"""
+    with edit_rclone_conf(conf_path) as conf:
+        for name in remote_names:
+            # Remove the section for the remote
+            conf.remove(name)
 
-def delete_remote(remote_name):
-    config = configparser.ConfigParser()
-    config.read(RCLONE_CONF_PATH)
-
-    # Check if the remote exists in the config
-    if remote_name not in config.sections():
-        print(f"Remote '{remote_name}' not found.")
-        return
-    
-    # Remove the section for the remote
-    config.remove_section(remote_name)
-    
-    # Write the updated config back to file
-    with open(RCLONE_CONF_PATH, 'w') as configfile:
-        config.write(configfile)
-    print(f"Remote '{remote_name}' deleted successfully.")
+    for remote_name in remote_names:
+        print(f"Remote '{remote_name}' deleted successfully.")
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: delete_remote.py <remote_name>")
+    if len(sys.argv) < 2:
+        print("Usage: delete_remote.py <remote_name> [<remote_name> ...]")
+        sys.exit(1)
+
+    remote_names = list(dict.fromkeys(sys.argv[1:]))
+    try:
+        delete_remotes(remote_names)
+    except (ValueError, OSError) as e:
+        print(e, file=sys.stderr)
         sys.exit(1)
-    
-    remote_name = sys.argv[1]
-    delete_remote(remote_name)
@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+# get_vdev_alias_index() comes from vdev_alias_index.py, prepended by server.ts
 import os
 import json
 import sys
@@ -30,16 +31,12 @@ def populate_disk_information(disk: dict) -> dict:
 
 def get_disk_info():
     disks = []
-    with open("/etc/vdev_id.conf", "r") as vdev_id:
-        for vdev_id_line in vdev_id:
-            regex = re.search("^alias\s+(\d+-\d+)\s+(\S+)", vdev_id_line)
-            if regex == None:
-                continue
-            disks.append(
-                populate_disk_information(
-                    {"dev-by-path": regex.group(2), "bay-id": regex.group(1)}
-                )
-            )
+    for bay_id, dev_by_path in get_vdev_alias_index().items():
+        if not re.fullmatch(r"\d+-\d+", bay_id):
+            continue
+        disks.append(
+            populate_disk_information({"dev-by-path": dev_by_path, "bay-id": bay_id})
+        )
     return disks
 
 
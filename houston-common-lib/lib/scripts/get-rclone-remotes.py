@@ -1,36 +1,170 @@
 #!/usr/bin/env python3
-import configparser
+# read_rclone_conf() and RCLONE_CONF_PATH come from scripts/rclone_conf_store.py,
+# which RemoteManager.ts prepends to this script.
+import os
+import sys
 import json
+import time
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
-RCLONE_CONF_PATH = '/root/.config/rclone/rclone.conf'
+# the cache holds remote credentials, so it lives beside rclone.conf and shares
+# its protection; earlier versions kept it in /var/cache
+CACHE_NAME = '.houston-remotes-cache.json'
+LEGACY_CACHE_PATH = '/var/cache/houston/rclone/remotes.json'
+PROBE_TIMEOUT = 15
+PROBE_WORKERS = 8
 
 class CloudSyncRemote:
     def __init__(self, name, type, parameters):
         self.name = name
         self.type = type
         self.parameters = parameters
-    
+
     def __str__(self):
         params_str = '\n'.join([f"  {key}: {value}" for key, value in self.parameters.items()])
         return f"name: {self.name}\ntype: {self.type}\parameters:\n{params_str}\n"
 
-def load_remotes_from_conf():
-    config = configparser.ConfigParser()
-    config.read(RCLONE_CONF_PATH)
-    
+def conf_cache_key(conf_path):
+    """Identity of the config file as it is now; a rename over it changes the inode
+    even when mtime and size happen to match"""
+    try:
+        st = os.stat(conf_path)
+    except FileNotFoundError:
+        return {'path': conf_path, 'missing': True}
+    return {'path': conf_path, 'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'ino': st.st_ino}
+
+def default_cache_path(conf_path):
+    return os.path.join(os.path.dirname(conf_path) or '.', CACHE_NAME)
+
+def remove_legacy_cache():
+    try:
+        os.unlink(LEGACY_CACHE_PATH)
+    except OSError:
+        pass
+
+def load_cached_remotes(cache_path, key):
+    try:
+        with open(cache_path, 'r') as cache_file:
+            cache = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    if cache.get('key') != key:
+        return None
+    return cache.get('remotes')
+
+def save_cached_remotes(cache_path, key, remotes):
+    """Best effort: without write access the config is just parsed on every run"""
+    cache_dir = os.path.dirname(cache_path)
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        # mkstemp creates the file 0600
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.remotes.')
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'w') as cache_file:
+            json.dump({'key': key, 'remotes': remotes}, cache_file)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+def load_remotes_from_conf(conf_path=RCLONE_CONF_PATH, cache_path=None):
+    """Remotes from the cache while the config is unchanged, parsed from it otherwise.
+    The cache is next to the config unless cache_path is given, "" disables it."""
+    if cache_path is None:
+        cache_path = default_cache_path(conf_path)
+    key = conf_cache_key(conf_path)
+    if cache_path:
+        cached = load_cached_remotes(cache_path, key)
+        if cached is not None:
+            return cached
+
+    config = read_rclone_conf(conf_path)
     remotes = []
-    
-    for section in config.sections():
-        type = config.get(section, 'type', fallback='unknown')
-        parameters = {key: value for key, value in config.items(section) if key != 'type'}
+
+    for section in config.names():
+        parameters = config.get(section)
+        type = parameters.pop('type', 'unknown')
         remote = CloudSyncRemote(name=section, type=type, parameters=parameters)
-        remotes.append(remote)
-    
-    return json.dumps([remote.__dict__ for remote in remotes], indent=4)
+        remotes.append(remote.__dict__)
+
+    if cache_path:
+        save_cached_remotes(cache_path, key, remotes)
+    return remotes
+
+def run_rclone(argv, conf_path, timeout):
+    # fail fast instead of rclone's own retries, the whole call is bounded by timeout
+    cmd = ['rclone', '--config', conf_path, '--contimeout', f'{timeout}s', '--timeout', f'{timeout}s',
+           '--retries', '1', '--low-level-retries', '1'] + argv
+    return subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, timeout=timeout)
+
+def probe_remote(name, conf_path, timeout):
+    """Reachability, latency and quota of one remote. `rclone about` gives the quota;
+    backends without it are checked by listing their top-level directories."""
+    started = time.monotonic()
+    probe = {'reachable': False, 'ms': None, 'method': 'about', 'quota': None, 'error': None}
+    try:
+        result = run_rclone(['about', f'{name}:', '--json'], conf_path, timeout)
+        if result.returncode == 0:
+            probe['reachable'] = True
+            probe['quota'] = json.loads(result.stdout)
+        else:
+            probe['method'] = 'lsd'
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired('rclone', timeout)
+            result = run_rclone(['lsd', f'{name}:', '--max-depth', '1'], conf_path, remaining)
+            probe['reachable'] = result.returncode == 0
+            if not probe['reachable']:
+                probe['error'] = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else f"rclone exited with {result.returncode}"
+    except subprocess.TimeoutExpired:
+        probe['error'] = f"timed out after {timeout}s"
+    except ValueError as e:
+        probe['error'] = f"unexpected rclone about output: {e}"
+    except OSError as e:
+        probe['error'] = str(e)
+    probe['ms'] = round((time.monotonic() - started) * 1000, 1)
+    return probe
+
+def probe_remotes(names, conf_path, timeout, jobs):
+    if not names:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(jobs, len(names))) as executor:
+        probes = executor.map(lambda name: probe_remote(name, conf_path, timeout), names)
+        return dict(zip(names, probes))
 
 def main():
-    remotes = load_remotes_from_conf()
-    print(remotes)
+    parser = argparse.ArgumentParser(description='List the remotes in rclone.conf, optionally checking that they work')
+    parser.add_argument('--config', type=str, default=RCLONE_CONF_PATH, help=f'rclone config file ({RCLONE_CONF_PATH} by default)')
+    parser.add_argument('--cache', type=str, default=None, help=f'listing cache, "" to disable ({CACHE_NAME} beside the config by default)')
+    parser.add_argument('--probe', action='store_true', help='also check reachability, latency and quota of the remotes concurrently')
+    parser.add_argument('-r', '--remote', action='append', default=[], help='remote to probe (all remotes by default), repeatable')
+    parser.add_argument('-t', '--timeout', type=float, default=PROBE_TIMEOUT, help=f'seconds each probe may take ({PROBE_TIMEOUT} by default)')
+    parser.add_argument('-j', '--jobs', type=int, default=PROBE_WORKERS, help=f'remotes probed at once ({PROBE_WORKERS} by default)')
+    args = parser.parse_args()
+
+    if args.timeout <= 0 or args.jobs < 1:
+        parser.error("--timeout must be > 0 and --jobs >= 1")
+
+    remove_legacy_cache()
+    remotes = load_remotes_from_conf(args.config, args.cache)
+    if not args.probe:
+        print(json.dumps(remotes, indent=4))
+        return
+
+    known = [remote['name'] for remote in remotes]
+    unknown = [name for name in args.remote if name not in known]
+    if unknown:
+        print(f"unknown remote: {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(2)
+    probes = probe_remotes(list(dict.fromkeys(args.remote)) or known, args.config, args.timeout, args.jobs)
+    print(json.dumps({'remotes': remotes, 'probes': probes}, indent=4))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,6 +1,8 @@
 import os
 import re
 import json
+import time
+import argparse
 import subprocess
 
 currentTaskTemplates = ['ZfsReplicationTask', 'AutomatedSnapshotTask', 'ScrubTask', 'RsyncTask', 'SmartTest', 'CustomTask', 'CloudSyncTask']
@@ -59,72 +61,191 @@ def find_template_basenames(template_dir):
     return base_names
 
 
-def find_valid_task_data_files(system_dir, template_basenames):
-    valid_files = {}
-    # Adjusted regex to match up to the last dot before extension
-    file_regex = re.compile(r"^houston_scheduler_([^_]+)_(.*)\.(env|json|txt)$")
-
-    for file in os.listdir(system_dir):
-        match = file_regex.match(file)
-        if match:
-            template_name, task_name_with_suffix, suffix = match.groups()
-            # Extract the task name correctly before appending the file to the list
-            if template_name in template_basenames:
-                if template_name not in valid_files:
-                    valid_files[template_name] = []
-                # Include the correct file format with the suffix
-                valid_files[template_name].append(file)
-
-    return valid_files
-
-def create_task_instances(system_dir, valid_files):
-    task_instances = []
-
-    for template, files in valid_files.items():
-        paired_files = {}
-
-        for file in files:
-            full_base_name, ext = os.path.splitext(file)
-            # Remove the prefix and then split properly
-            task_name = full_base_name[len("houston_scheduler_" + template + "_"):]  # This strips the prefix and template
-
-            if task_name not in paired_files:
-                paired_files[task_name] = {}
-            paired_files[task_name][ext] = file
-
-        for task_name, file_dict in paired_files.items():
-            if '.env' in file_dict:
-                env_file_name = file_dict['.env']
-                parameters = read_env_parameters(os.path.join(system_dir, env_file_name))
-                
-                if '.json' in file_dict:
-                    json_file_name = file_dict['.json']
-                    schedule_data = read_json_schedule(os.path.join(system_dir, json_file_name))
-                    schedule = TaskSchedule(schedule_data['enabled'], schedule_data['intervals'])
-                else:
-                    schedule = TaskSchedule(False, [])
-                
-                if '.txt' in file_dict:
-                    notes_file_name = file_dict['.txt']
-                    notes_file_path = os.path.join(system_dir, notes_file_name)
-                    notes = read_txt_notes(notes_file_path)  # Read the notes from the .txt file
-                else:
-                    # notes = json.dumps(file_dict, indent=4)  # Convert dict to JSON string for readability
-                    notes = "" 
-
-            task_instance = TaskInstance(task_name, template, parameters, schedule, notes)
-            task_instances.append(task_instance)
-
-    return json.dumps([instance.__dict__ for instance in task_instances], indent=4)
+TASK_FILE_RE = re.compile(r"^houston_scheduler_([^_]+)_(.*)\.(env|json|txt)$")
+TASK_INDEX_PATH = '/var/cache/houston/scheduler/task-index.json'
+TASK_INDEX_VERSION = 1
+REMOVED_RETENTION = 30 * 24 * 3600  # seconds a removal stays visible to --since
+
+
+def scan_task_files(system_dir, template_names):
+    """{(template, task name): {ext: [mtime_ns, size]}} from a single directory scan"""
+    task_files = {}
+    with os.scandir(system_dir) as entries:
+        for entry in entries:
+            match = TASK_FILE_RE.match(entry.name)
+            if not match:
+                continue
+            template_name, task_name, suffix = match.groups()
+            if template_name not in template_names:
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            task_files.setdefault((template_name, task_name), {})['.' + suffix] = [st.st_mtime_ns, st.st_size]
+    return task_files
+
+
+def read_task_instance(system_dir, template, task_name):
+    base_path = os.path.join(system_dir, f"houston_scheduler_{template}_{task_name}")
+    parameters = read_env_parameters(base_path + '.env')
+    if os.path.exists(base_path + '.json'):
+        schedule_data = read_json_schedule(base_path + '.json')
+        schedule = TaskSchedule(schedule_data['enabled'], schedule_data['intervals'])
+    else:
+        schedule = TaskSchedule(False, [])
+    if os.path.exists(base_path + '.txt'):
+        notes = read_txt_notes(base_path + '.txt')
+    else:
+        notes = ""
+    return TaskInstance(task_name, template, parameters, schedule, notes).__dict__
+
+
+def load_task_index(index_path):
+    try:
+        with open(index_path, 'r') as index_file:
+            index = json.load(index_file)
+        if index.get('version') == TASK_INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {'version': TASK_INDEX_VERSION, 'generated': 0, 'tasks': {}, 'removed': {}}
+
+
+def save_task_index(index_path, index):
+    """Best effort: without write access the index is just rebuilt on every run"""
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        with open(tmp_path, 'w') as index_file:
+            json.dump(index, index_file)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def update_task_index(system_dir, index):
+    """Re-read only the tasks whose .env/.json/.txt mtime or size changed since the
+    index was written, and record when each task last changed or was removed.
+    Returns whether the index needs to be written back."""
+    generated = time.time()
+    old_tasks = index['tasks']
+    tasks = {}
+    for (template, task_name), files in scan_task_files(system_dir, currentTaskTemplates).items():
+        if '.env' not in files:
+            continue
+        key = f"{template}_{task_name}"
+        cached = old_tasks.get(key)
+        if cached is not None and cached['files'] == files:
+            tasks[key] = cached
+            continue
+        try:
+            task = read_task_instance(system_dir, template, task_name)
+        except (OSError, ValueError, KeyError):
+            # removed or half-written while scanning; picked up on the next run. A
+            # known task keeps its cached entry (and old file stats, so it is
+            # re-read next time) instead of being reported as removed.
+            if cached is not None:
+                tasks[key] = cached
+            continue
+        tasks[key] = {'files': files, 'changed': generated, 'task': task}
+
+    removed = {
+        key: entry for key, entry in index['removed'].items()
+        if key not in tasks and generated - entry['removed'] < REMOVED_RETENTION
+    }
+    for key, cached in old_tasks.items():
+        if key not in tasks:
+            removed[key] = {
+                'name': cached['task']['name'],
+                'template': cached['task']['template'],
+                'removed': generated,
+            }
+
+    dirty = tasks != old_tasks or removed != index['removed']
+    index.update(generated=generated, tasks=tasks, removed=removed)
+    return dirty
+
+
+SERVICE_STATUS_PROPERTIES = ['ActiveState', 'SubState', 'Result', 'ExecMainStatus', 'ExecMainStartTimestamp', 'ExecMainExitTimestamp']
+TIMER_STATUS_PROPERTIES = ['ActiveState', 'SubState', 'NextElapseUSecRealtime', 'LastTriggerUSec']
+
+
+def get_unit_properties(units, properties):
+    """{unit: {property: value}} for all units from a single `systemctl show`"""
+    if not units:
+        return {}
+    result = subprocess.run(
+        ['systemctl', 'show', '--all', '-p', ','.join(['Id'] + properties)] + units,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True
+    )
+    unit_properties = {}
+    for block in result.stdout.split('\n\n'):
+        props = dict(line.split('=', 1) for line in block.splitlines() if '=' in line)
+        unit_id = props.pop('Id', None)
+        if unit_id:
+            unit_properties[unit_id] = {prop: props.get(prop, '') for prop in properties}
+    return unit_properties
+
+
+def get_task_statuses(keys):
+    """{task key: {"service": {...}, "timer": {...}}} for every task, from one systemctl call"""
+    units = []
+    for key in keys:
+        units.append(f"houston_scheduler_{key}.service")
+        units.append(f"houston_scheduler_{key}.timer")
+    unit_properties = get_unit_properties(units, sorted(set(SERVICE_STATUS_PROPERTIES + TIMER_STATUS_PROPERTIES)))
+    statuses = {}
+    for key in keys:
+        service = unit_properties.get(f"houston_scheduler_{key}.service", {})
+        timer = unit_properties.get(f"houston_scheduler_{key}.timer", {})
+        statuses[key] = {
+            'service': {prop: service.get(prop, '') for prop in SERVICE_STATUS_PROPERTIES},
+            'timer': {prop: timer.get(prop, '') for prop in TIMER_STATUS_PROPERTIES},
+        }
+    return statuses
+
 
 def main():
+    parser = argparse.ArgumentParser(description='List scheduler task instances')
+    parser.add_argument('--since', type=float, help='only report tasks changed or removed after this "generated" timestamp of an earlier run')
+    parser.add_argument('--with-status', action='store_true', help='attach systemd service/timer state to every task (one systemctl call)')
+    parser.add_argument('--index', type=str, default=TASK_INDEX_PATH, help=f'task index cache file ({TASK_INDEX_PATH} by default)')
+    args = parser.parse_args()
+
     system_dir = '/etc/systemd/system/'
 
-    # Check files in the system directory for those containing any of the task template names
-    valid_task_data_files = find_valid_task_data_files(system_dir, currentTaskTemplates)
-    
-    task_instances = create_task_instances(system_dir, valid_task_data_files)
-    print(task_instances)   
-    
+    index = load_task_index(args.index)
+    if update_task_index(system_dir, index):
+        save_task_index(args.index, index)
+
+    statuses = get_task_statuses(list(index['tasks'])) if args.with_status else None
+
+    def task_output(key, entry):
+        if statuses is None:
+            return entry['task']
+        return {**entry['task'], 'status': statuses[key]}
+
+    if args.since is None:
+        print(json.dumps([task_output(key, entry) for key, entry in index['tasks'].items()], indent=4))
+        return
+
+    output = {
+        'tasks': [task_output(key, entry) for key, entry in index['tasks'].items() if entry['changed'] > args.since],
+        'removed': [
+            {'name': entry['name'], 'template': entry['template']}
+            for entry in index['removed'].values() if entry['removed'] > args.since
+        ],
+        'generated': index['generated'],
+    }
+    if statuses is not None:
+        # state changes without the task files changing, so always report all of it
+        output['statuses'] = statuses
+    print(json.dumps(output, indent=4))
+
+
 if __name__ == "__main__":
-	main()
\ No newline at end of file
+    main()
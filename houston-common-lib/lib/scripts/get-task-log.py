@@ -0,0 +1,155 @@
+import os
+import sys
+import json
+import time
+import select
+import argparse
+import subprocess
+
+DEFAULT_LIMIT = 200
+FOLLOW_STATE_CHECK_SEC = 5
+
+
+def journal_entry(raw):
+    """Structured entry from one `journalctl -o json` line"""
+    fields = json.loads(raw)
+    message = fields.get('MESSAGE', '')
+    if isinstance(message, list):
+        # non-UTF-8 messages are exported as byte arrays
+        message = bytes(message).decode('utf-8', errors='replace')
+    elif message is None:
+        message = ''
+    return {
+        'cursor': fields['__CURSOR'],
+        'timestamp': int(fields.get('__REALTIME_TIMESTAMP', 0)),
+        'message': message,
+        'priority': int(fields['PRIORITY']) if fields.get('PRIORITY', '').isdigit() else None,
+        'pid': fields.get('_PID'),
+        'invocationId': fields.get('_SYSTEMD_INVOCATION_ID') or fields.get('INVOCATION_ID'),
+    }
+
+
+def journal_command(args, *extra):
+    cmd = ['journalctl', '-o', 'json', '--no-pager', '--all']
+    if args.invocation:
+        cmd.append(f'_SYSTEMD_INVOCATION_ID={args.invocation}')
+    else:
+        cmd.extend(['-u', args.unit])
+    if args.since:
+        cmd.extend(['--since', args.since])
+    return cmd + list(extra)
+
+
+def read_entries(cmd, limit, skip_cursor=None):
+    """Up to limit + 1 entries, stopping journalctl as soon as they've been read
+    instead of exporting the whole log"""
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    entries = []
+    try:
+        for line in proc.stdout:
+            if not line.strip():
+                continue
+            entry = journal_entry(line)
+            if entry['cursor'] == skip_cursor:
+                continue
+            entries.append(entry)
+            if len(entries) > limit:
+                break
+    finally:
+        proc.terminate()
+        proc.wait()
+    return entries
+
+
+def get_page(args):
+    """Newest entries by default, entries after --after-cursor (oldest first), or
+    entries before --before-cursor for paging backwards"""
+    if args.after_cursor:
+        entries = read_entries(journal_command(args, '--after-cursor', args.after_cursor), args.limit)
+        has_more = len(entries) > args.limit
+        entries = entries[:args.limit]
+    else:
+        extra = ['-r']
+        if args.before_cursor:
+            # --cursor includes the entry itself, which read_entries skips
+            extra.extend(['--cursor', args.before_cursor])
+        entries = read_entries(journal_command(args, *extra), args.limit, skip_cursor=args.before_cursor)
+        has_more = len(entries) > args.limit
+        entries = entries[:args.limit]
+        entries.reverse()
+    return {
+        'entries': entries,
+        'firstCursor': entries[0]['cursor'] if entries else args.before_cursor,
+        'lastCursor': entries[-1]['cursor'] if entries else args.after_cursor,
+        # newer entries for --after-cursor, older ones otherwise
+        'hasMore': has_more,
+    }
+
+
+def unit_is_active(unit):
+    result = subprocess.run(['systemctl', 'is-active', unit], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    return result.stdout.strip() in ('active', 'activating', 'deactivating', 'reloading')
+
+
+def follow(args):
+    """Stream new entries as newline-delimited JSON messages. With --until-inactive,
+    stop once the task's service is no longer running and its output is drained."""
+    extra = ['-f']
+    if args.after_cursor:
+        extra.extend(['--after-cursor', args.after_cursor])
+    else:
+        extra.extend(['-n', '0'])
+    proc = subprocess.Popen(journal_command(args, *extra), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    fd = proc.stdout.fileno()
+    buffer = b''
+    next_check = time.monotonic() + FOLLOW_STATE_CHECK_SEC
+    inactive = False
+    try:
+        while True:
+            readable, _, _ = select.select([fd], [], [], FOLLOW_STATE_CHECK_SEC)
+            if readable:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                buffer += chunk
+                *lines, buffer = buffer.split(b'\n')
+                for line in lines:
+                    if line.strip():
+                        print(json.dumps({'type': 'entry', **journal_entry(line.decode('utf-8', errors='replace'))}), flush=True)
+            elif inactive:
+                # nothing new since the unit stopped: its output is drained
+                break
+            if args.until_inactive and time.monotonic() >= next_check:
+                next_check = time.monotonic() + FOLLOW_STATE_CHECK_SEC
+                inactive = not unit_is_active(f'{args.unit}.service')
+        print(json.dumps({'type': 'end'}), flush=True)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Read a scheduler task\'s journal as structured entries')
+    parser.add_argument('unit', type=str, help='full task unit name, e.g. houston_scheduler_ScrubTask_weekly')
+    parser.add_argument('-a', '--after-cursor', type=str, help='only entries after this cursor (oldest first)')
+    parser.add_argument('-b', '--before-cursor', type=str, help='entries before this cursor, for paging backwards')
+    parser.add_argument('-n', '--limit', type=int, default=DEFAULT_LIMIT, help=f'entries per page ({DEFAULT_LIMIT} by default)')
+    parser.add_argument('-i', '--invocation', type=str, help='only entries of this run (systemd InvocationID)')
+    parser.add_argument('-s', '--since', type=str, help='only entries since this time (journalctl --since syntax)')
+    parser.add_argument('-f', '--follow', action='store_true', help='stream new entries as newline-delimited JSON')
+    parser.add_argument('--until-inactive', action='store_true', help='with --follow, stop once the task is no longer running')
+    args = parser.parse_args()
+
+    if args.after_cursor and args.before_cursor:
+        parser.error("--after-cursor and --before-cursor are mutually exclusive")
+    if args.limit < 1:
+        parser.error("--limit must be at least 1")
+
+    if args.follow:
+        follow(args)
+    else:
+        print(json.dumps(get_page(args)))
+
+
+if __name__ == "__main__":
+    main()
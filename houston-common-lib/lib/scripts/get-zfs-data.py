@@ -1,6 +1,11 @@
+# ssh_command() and ssh_destination() come from scripts/ssh_session.py, which
+# helpers.ts prepends to this script.
 import subprocess
 import json
 import argparse
+import re
+
+ZFS_PROPERTY_RE = re.compile(r"^[a-z0-9_.:]+$")
 
 def get_local_zfs_pools():
     try:
@@ -13,12 +18,8 @@ def get_local_zfs_pools():
 
 def get_remote_zfs_pools(host, port=22, user='root'):
     try:
-        ssh_cmd = ['ssh']
-        if port != '22':
-            ssh_cmd.extend(['-p', port])
-        ssh_cmd.append(f"{user}@{host}")
-        ssh_cmd.extend(['zpool', 'list', '-H', '-o', 'name'])
-        
+        ssh_cmd = ssh_command(ssh_destination(host, user), ['zpool', 'list', '-H', '-o', 'name'], port)
+
         result = subprocess.check_output(ssh_cmd, stderr=subprocess.STDOUT, universal_newlines=True)
         pools = result.strip().split('\n')
         return {"success": True, "data": pools, "error": None}
@@ -60,12 +61,8 @@ def get_local_zfs_datasets(pool):
 
 def get_remote_zfs_datasets(pool, host, port=22, user='root'):
     try:
-        ssh_cmd = ['ssh']
-        if port != '22':
-            ssh_cmd.extend(['-p', port])
-        ssh_cmd.append(f"{user}@{host}")
-        ssh_cmd.extend(['zfs', 'list', '-H', '-o', 'name', '-r', pool])
-        
+        ssh_cmd = ssh_command(ssh_destination(host, user), ['zfs', 'list', '-H', '-o', 'name', '-r', pool], port)
+
         result = subprocess.check_output(ssh_cmd, stderr=subprocess.STDOUT, universal_newlines=True)
         datasets = result.strip().split('\n')
         return {"success": True, "data": datasets, "error": None}
@@ -73,13 +70,59 @@ def get_remote_zfs_datasets(pool, host, port=22, user='root'):
         print(f"Error {e}")
         return {"success": False, "data": [], "error": str(e)}
 
+def run_zfs_command(argv, host=None, port='22', user='root'):
+    """Run argv locally, or on host over the shared ssh session"""
+    if host:
+        argv = ssh_command(ssh_destination(host, user), argv, port)
+    return subprocess.check_output(argv, stderr=subprocess.PIPE, universal_newlines=True)
+
+def property_value(value):
+    if value == '-':
+        return None
+    if value.isdigit():
+        return int(value)
+    return value
+
+def get_zfs_tree(properties, snapshots, host=None, port='22', user='root'):
+    """Every pool with its datasets (and the requested properties) from one `zfs list` call.
+    Snapshots are only listed when counting them, and are folded into a per-dataset count."""
+    try:
+        types = 'filesystem,volume,snapshot' if snapshots else 'filesystem,volume'
+        argv = ['zfs', 'list', '-H', '-p', '-r', '-t', types, '-o', ','.join(['name'] + properties)]
+        output = run_zfs_command(argv, host, port, user)
+        pools = []
+        datasets = {}
+        for line in output.splitlines():
+            fields = line.split('\t')
+            name = fields[0]
+            if '@' in name:
+                dataset = datasets.get(name.split('@', 1)[0])
+                if dataset is not None:
+                    dataset['snapshots'] += 1
+                continue
+            dataset = {'name': name}
+            for prop, value in zip(properties, fields[1:]):
+                dataset[prop] = property_value(value)
+            if snapshots:
+                dataset['snapshots'] = 0
+            datasets[name] = dataset
+            if '/' not in name:
+                pools.append({'name': name, 'datasets': []})
+            pools[-1]['datasets'].append(dataset)
+        return {"success": True, "data": pools, "error": None}
+    except subprocess.CalledProcessError as e:
+        print(f"Error {e}")
+        return {"success": False, "data": [], "error": str(e)}
+
 def main():
     parser = argparse.ArgumentParser(description='Get Pools or Datasets from Local or Remote system')
-    parser.add_argument('-t', '--type', type=str, choices=['pools', 'datasets'], required=True, help='Specify whether to get pools or datasets')
+    parser.add_argument('-t', '--type', type=str, choices=['pools', 'datasets', 'tree'], required=True, help='Specify whether to get pools, datasets of one pool, or every pool with its datasets')
     parser.add_argument('-H', '--host', type=str, help='hostname of remote system')
     parser.add_argument('-p', '--port', type=str, default='22', help='port to connect via ssh (22 by default)')
     parser.add_argument('-u', '--user', type=str, default='root', help='user of remote system (root by default)')
     parser.add_argument('-P', '--pool', type=str, help='zfs pool to get datasets from (required if type is datasets)')
+    parser.add_argument('-o', '--properties', type=str, default='', help='comma-separated zfs properties to include per dataset (tree only), e.g. used,avail,mountpoint')
+    parser.add_argument('-s', '--snapshots', action='store_true', help='include a snapshot count per dataset (tree only)')
 
     args = parser.parse_args()
     
@@ -95,6 +138,12 @@ def main():
             result = get_remote_zfs_datasets(args.pool, args.host, args.port, args.user)
         else:
             result = get_local_zfs_datasets(args.pool)
+    elif args.type == 'tree':
+        properties = [prop for prop in args.properties.split(',') if prop]
+        for prop in properties:
+            if not ZFS_PROPERTY_RE.match(prop) or prop == 'name':
+                parser.error(f"invalid zfs property: {prop}")
+        result = get_zfs_tree(properties, args.snapshots, args.host, args.port, args.user)
     
     print(json.dumps(result))
 
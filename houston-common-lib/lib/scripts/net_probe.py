@@ -0,0 +1,147 @@
+import time
+import errno
+import socket
+import select
+import subprocess
+
+# TCP reachability probing with non-blocking sockets. Prepended by helpers.ts to
+# the scripts that use it; probe_netcat() also needs scripts/ssh_session.py.
+
+PROBE_TIMEOUT = 10.0
+PROBE_RETRIES = 20
+PROBE_BACKOFF_INITIAL = 0.05
+PROBE_BACKOFF_MAX = 1.0
+
+
+def tcp_connect(host, port, timeout):
+    """Connect with a non-blocking socket, waiting at most timeout seconds for the
+    handshake. Returns (socket, seconds the handshake took); raises OSError."""
+    last_error = None
+    deadline = time.monotonic() + timeout
+    for family, socktype, proto, _, address in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM):
+        sock = socket.socket(family, socktype, proto)
+        sock.setblocking(False)
+        started = time.monotonic()
+        try:
+            err = sock.connect_ex(address)
+            if err in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+                _, writable, _ = select.select([], [sock], [], max(0, deadline - time.monotonic()))
+                if not writable:
+                    raise socket.timeout(f"connecting to {host}:{port} timed out")
+                err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err != 0:
+                raise OSError(err, f"{host}:{port}: {errno.errorcode.get(err, err)}")
+            return sock, time.monotonic() - started
+        except OSError as e:
+            sock.close()
+            last_error = e
+    raise last_error or OSError(f"could not resolve {host}")
+
+
+def probe_port(host, port, timeout=PROBE_TIMEOUT, retries=PROBE_RETRIES, give_up=None):
+    """Retry connecting with exponential backoff until it succeeds, retries attempts
+    were made, timeout seconds passed or give_up() returns a reason to stop. Refused
+    connections are retried, since a listener may still be starting.
+    Returns (result, connected socket or None)."""
+    deadline = time.monotonic() + timeout
+    delay = PROBE_BACKOFF_INITIAL
+    attempts = 0
+    error = None
+    while attempts < retries:
+        attempts += 1
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            sock, rtt = tcp_connect(host, port, remaining)
+            return {'reachable': True, 'rttMs': round(rtt * 1000, 3), 'attempts': attempts, 'error': None}, sock
+        except socket.gaierror as e:
+            # retrying won't make the name resolve
+            error = str(e)
+            break
+        except OSError as e:
+            error = str(e)
+        reason = give_up() if give_up else None
+        if reason:
+            error = f"{error}; {reason}"
+            break
+        time.sleep(max(0, min(delay, deadline - time.monotonic())))
+        delay = min(delay * 2, PROBE_BACKOFF_MAX)
+    return {'reachable': False, 'rttMs': None, 'attempts': attempts, 'error': error or 'timed out'}, None
+
+
+def sample_throughput(sock, max_bytes, timeout):
+    """Read up to max_bytes from sock for at most timeout seconds, timed from the
+    first byte received so connection setup is not counted"""
+    received = 0
+    first_byte = None
+    last_byte = None
+    deadline = time.monotonic() + timeout
+    sock.setblocking(False)
+    while received < max_bytes:
+        readable, _, _ = select.select([sock], [], [], max(0, deadline - time.monotonic()))
+        if not readable:
+            break
+        try:
+            chunk = sock.recv(min(65536, max_bytes - received))
+        except BlockingIOError:
+            continue
+        except OSError:
+            break
+        if not chunk:
+            break
+        last_byte = time.monotonic()
+        if first_byte is None:
+            first_byte = last_byte
+        received += len(chunk)
+    seconds = (last_byte - first_byte) if first_byte is not None else 0.0
+    return {
+        'bytes': received,
+        'seconds': round(seconds, 6),
+        'bytesPerSecond': round(received / seconds) if seconds > 0 else None,
+    }
+
+
+def start_remote_listener(destination, port, sample_bytes, timeout):
+    """Run a one-shot nc listener over ssh that sends sample_bytes to whoever connects.
+    It exits after that connection, or after timeout seconds if nobody connects, so
+    nothing has to be killed afterwards."""
+    source = f'head -c {sample_bytes} /dev/zero' if sample_bytes > 0 else 'true'
+    listen_cmd = f'{source} | timeout {int(timeout) + 5} nc -l {port}'
+    return subprocess.Popen(
+        ssh_command(destination, [listen_cmd]),
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True
+    )
+
+
+def listener_failure(listener):
+    """Why the listener exited early, or None while it's still waiting for a connection"""
+    if listener is None or listener.poll() is None:
+        return None
+    stderr = listener.stderr.read().strip()
+    return f"listener exited with {listener.returncode}" + (f": {stderr}" if stderr else "")
+
+
+def probe_netcat(destination, host, port, timeout=PROBE_TIMEOUT, retries=PROBE_RETRIES, sample_bytes=0, listen=True):
+    """Start a listener on port through an ssh session to destination (unless listen
+    is False and something already listens there), connect to it on host and take a
+    throughput sample. Returns {reachable, rttMs, attempts, throughput, error}."""
+    listener = start_remote_listener(destination, port, sample_bytes, timeout) if listen else None
+    result = {'reachable': False, 'rttMs': None, 'attempts': 0, 'throughput': None, 'error': None}
+    sock = None
+    try:
+        # polls until the listener accepts instead of sleeping a fixed time
+        probe, sock = probe_port(host, port, timeout, retries, lambda: listener_failure(listener))
+        result.update(probe)
+        if sock is not None and sample_bytes > 0:
+            result['throughput'] = sample_throughput(sock, sample_bytes, timeout)
+    finally:
+        if sock is not None:
+            sock.close()
+        if listener is not None:
+            try:
+                listener.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                listener.terminate()
+                listener.wait()
+    return result
@@ -0,0 +1,163 @@
+import os
+import re
+import fcntl
+import tempfile
+import contextlib
+
+# Line-preserving rclone.conf editing. Edits touch only the lines of the sections
+# and keys they change, so comments, blank lines and ordering survive; writes
+# are serialized with flock and land with an atomic rename. Prepended by
+# RemoteManager.ts to the scripts that use it.
+
+RCLONE_CONF_PATH = '/root/.config/rclone/rclone.conf'
+
+SECTION_RE = re.compile(r"^\s*\[([^\]]+)\]\s*$")
+KEY_RE = re.compile(r"^\s*([^=:\s#;][^=:]*?)\s*[=:]\s*(.*?)\s*$")
+
+
+class RcloneConf:
+    """rclone.conf as a preamble plus sections that keep their raw lines"""
+
+    def __init__(self, text=''):
+        self.preamble = []
+        self.sections = []  # [name, [lines after the header]]
+        current = self.preamble
+        for line in text.splitlines():
+            match = SECTION_RE.match(line)
+            if match:
+                current = []
+                self.sections.append([match.group(1).strip(), current])
+            else:
+                current.append(line)
+
+    def _find(self, name):
+        for section in self.sections:
+            if section[0] == name:
+                return section
+        return None
+
+    def names(self):
+        return [name for name, _ in self.sections]
+
+    def has(self, name):
+        return self._find(name) is not None
+
+    def get(self, name):
+        """{key: value} of a section, keys lowercased like configparser does"""
+        section = self._find(name)
+        if section is None:
+            raise KeyError(name)
+        values = {}
+        for line in section[1]:
+            match = KEY_RE.match(line)
+            if match:
+                values[match.group(1).lower()] = match.group(2)
+        return values
+
+    def add(self, name, values):
+        if self.has(name):
+            raise ValueError(f"Remote '{name}' already exists")
+        lines = [f"{key.lower()} = {value}" for key, value in values.items()]
+        if self.sections and self.sections[-1][1] and self.sections[-1][1][-1].strip():
+            # keep a blank line between sections, like rclone and configparser write them
+            self.sections[-1][1].append('')
+        elif not self.sections and self.preamble and self.preamble[-1].strip():
+            self.preamble.append('')
+        lines.append('')
+        self.sections.append([name, lines])
+
+    def update(self, name, values):
+        """Set keys in place; keys not mentioned are kept, new ones go after the last key"""
+        section = self._find(name)
+        if section is None:
+            raise ValueError(f"Remote '{name}' not found")
+        lines = section[1]
+        pending = {key.lower(): value for key, value in values.items()}
+        last_key_line = -1
+        for index, line in enumerate(lines):
+            match = KEY_RE.match(line)
+            if not match:
+                continue
+            last_key_line = index
+            key = match.group(1).lower()
+            if key in pending:
+                lines[index] = f"{key} = {pending.pop(key)}"
+        new_lines = [f"{key} = {value}" for key, value in pending.items()]
+        lines[last_key_line + 1:last_key_line + 1] = new_lines
+
+    def rename(self, old_name, new_name):
+        section = self._find(old_name)
+        if section is None:
+            raise ValueError(f"Remote '{old_name}' not found")
+        if old_name != new_name and self.has(new_name):
+            raise ValueError(f"Remote '{new_name}' already exists")
+        section[0] = new_name
+
+    def remove(self, name):
+        section = self._find(name)
+        if section is None:
+            raise ValueError(f"Remote '{name}' not found")
+        self.sections.remove(section)
+
+    def render(self):
+        lines = list(self.preamble)
+        for name, section_lines in self.sections:
+            lines.append(f"[{name}]")
+            lines.extend(section_lines)
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def read_rclone_conf(path=RCLONE_CONF_PATH):
+    """Parse the config without locking; writers replace it atomically, so a
+    reader never sees a partial file"""
+    try:
+        with open(path, 'r') as conf_file:
+            return RcloneConf(conf_file.read())
+    except FileNotFoundError:
+        return RcloneConf()
+
+
+def write_rclone_conf(path, text):
+    """Write through a temp file in the same directory and rename it over the config"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o600
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.rclone.conf.')
+    try:
+        with os.fdopen(fd, 'w') as temp_file:
+            temp_file.write(text)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+@contextlib.contextmanager
+def edit_rclone_conf(path=RCLONE_CONF_PATH):
+    """Lock, parse and yield the config, then write it back if it changed. Nothing
+    is written when the body raises, so a batch of edits applies all or nothing."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # the lock lives next to the config: locking the config itself would be lost
+    # as soon as a writer renames a new file over it
+    lock_fd = os.open(os.path.join(directory, f'.{os.path.basename(path)}.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+    with os.fdopen(lock_fd, 'r+') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        conf = read_rclone_conf(path)
+        original = conf.render()
+        yield conf
+        text = conf.render()
+        if text != original:
+            write_rclone_conf(path, text)
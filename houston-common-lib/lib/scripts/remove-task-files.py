@@ -1,71 +1,70 @@
+# systemctl_units() comes from scripts/systemd_units.py, which helpers.ts prepends
+# to this script.
 import os
+import json
 import subprocess
 import sys
 
-def delete_task_files(unit_name):
-    system_dir = '/etc/systemd/system/'
-    
-    prefix = "houston_scheduler_"
-    suffixes = ['.env', '.json', '.service', '.timer','.txt']
-    deleted_count = 0
-    
-    # Iterate through each file in the system directory
-    for file in os.listdir(system_dir):
+SYSTEM_DIR = '/etc/systemd/system/'
+PREFIX = "houston_scheduler_"
+SUFFIXES = ('.env', '.json', '.service', '.timer', '.txt')
+
+def find_task_files(unit_names):
+    """{unit name: [file names]} for all requested units from a single directory listing"""
+    wanted = set(unit_names)
+    task_files = {unit_name: [] for unit_name in unit_names}
+    for file in os.listdir(SYSTEM_DIR):
         # Check if the file matches the pattern for task files
-        if file.startswith(prefix) and file.endswith(tuple(suffixes)):
+        if file.startswith(PREFIX) and file.endswith(SUFFIXES):
             base_name = file[:file.rfind('.')]
-            if base_name == unit_name:
-                # If it matches the task name/unit, delete the file
-                full_path = os.path.join(system_dir, file)
-                os.remove(full_path)
-                deleted_count += 1
-                print(f"Deleted file: {full_path}")
+            if base_name in wanted:
+                task_files[base_name].append(file)
+    return task_files
 
-def check_for_timer_file(unit_name):
-    system_dir = '/etc/systemd/system/'
-    prefix = "houston_scheduler_"
-    suffix = '.timer'
-    
-    # Check for timer file presence
-    for file in os.listdir(system_dir):
-        print(f"Checking file: {file}")  # Debugging output
-        if file.startswith(prefix) and file.endswith(suffix):
-            base_name = file[:file.rfind('.')]
-            print(f"Found timer file with base_name: {base_name}")  # Debugging output
-            if base_name == unit_name:
-                print(f"Timer file for unit {unit_name} exists.")  # Debugging output
-                return True
+def remove_tasks(unit_names):
+    """Stop, disable and delete the files of every unit with one systemctl call per
+    step and a single daemon-reload at the end"""
+    task_files = find_task_files(unit_names)
+    units = [
+        file for unit_name in unit_names for file in sorted(task_files[unit_name])
+        if file.endswith(('.timer', '.service'))
+    ]
+    # timers first, so nothing is triggered while the services are stopped
+    units.sort(key=lambda unit: not unit.endswith('.timer'))
+
+    errors = {}
+    for action in ('stop', 'disable'):
+        for unit, error in systemctl_units(action, units).items():
+            errors.setdefault(unit[:unit.rfind('.')], f"{action} {unit} failed: {error}")
 
-    return False
+    removed = []
+    for unit_name in unit_names:
+        if unit_name in errors:
+            continue
+        try:
+            for file in task_files[unit_name]:
+                os.remove(os.path.join(SYSTEM_DIR, file))
+            removed.append(unit_name)
+        except OSError as e:
+            errors[unit_name] = str(e)
 
-def stop_systemd_timer(unit_name):
-    # Stop the timer
-    subprocess.run(['sudo', 'systemctl', 'stop', f'{unit_name}.timer'], check=True)
-    # Disable the timer
-    subprocess.run(['sudo', 'systemctl', 'disable', f'{unit_name}.timer'], check=True)
-    # Reload systemd to recognize new or changed units
-    subprocess.run(['sudo', 'systemctl', 'reset-failed'], check=True)
-    subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
+    if units:
+        # clears failed state of the removed units; it fails harmlessly for units that had none
+        subprocess.run(['sudo', 'systemctl', 'reset-failed'] + units, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
 
-def remove_systemd_service(unit_name):
-    # Stop the service
-    subprocess.run(['sudo', 'systemctl', 'stop', f'{unit_name}.service'], check=True)
-    # Disable the service
-    subprocess.run(['sudo', 'systemctl', 'disable', f'{unit_name}.service'], check=True)
-    # Reload systemd to recognize new or changed units
-    subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
+    return {"success": not errors, "removed": removed, "errors": errors}
 
 def main():
-    unit_name = sys.argv[1]
-    
-    if check_for_timer_file(unit_name):
-        stop_systemd_timer(unit_name)
-    remove_systemd_service(unit_name)
-    delete_task_files(unit_name)
-    subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
-    
+    unit_names = list(dict.fromkeys(sys.argv[1:]))
+    if not unit_names:
+        print(f"usage: {sys.argv[0]} UNIT_NAME [UNIT_NAME ...]", file=sys.stderr)
+        sys.exit(2)
+
+    result = remove_tasks(unit_names)
+    print(json.dumps(result))
+    if not result['success']:
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
-    
-    
-    
\ No newline at end of file
@@ -1,37 +1,76 @@
 import subprocess
+import json
 import sys
 import os
 
-def run_task_now(unit_name):
+SYSTEM_DIR = '/etc/systemd/system/'
+PREFIX = "houston_scheduler_"
+
+def find_service_files(unit_names):
+    """Subset of unit_names that have a .service file, from a single directory listing"""
+    services = {
+        file[:-len('.service')] for file in os.listdir(SYSTEM_DIR)
+        if file.startswith(PREFIX) and file.endswith('.service')
+    }
+    return [unit_name for unit_name in unit_names if unit_name in services]
+
+def needs_daemon_reload(services):
+    """Whether any of the units changed on disk since systemd last loaded them"""
+    result = subprocess.run(
+        ['sudo', 'systemctl', 'show', '-p', 'NeedDaemonReload'] + services,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True
+    )
+    if result.returncode != 0:
+        return True
+    return 'NeedDaemonReload=yes' in result.stdout.split()
+
+def run_tasks_now(unit_names):
+    """Start every task's service with one systemctl call, reloading systemd first only
+    if one of them changed on disk. Waits until all of them have finished starting."""
+    found = find_service_files(unit_names)
+    errors = {unit_name: 'could not find task service file' for unit_name in unit_names if unit_name not in found}
+    if not found:
+        return {"success": False, "started": [], "errors": errors}
+
+    services = [f'{unit_name}.service' for unit_name in found]
     try:
-        # Reload systemd to recognize new or changed units
-        subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
-        # Start the service 
-        subprocess.run(['sudo', 'systemctl', 'start', f'{unit_name}.service'], check=True)
+        if needs_daemon_reload(services):
+            # Reload systemd to recognize new or changed units
+            subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
     except subprocess.CalledProcessError as e:
-        print(f"Failed to run task: {e}")
-        sys.exit(1)
-        
-def check_for_service_file(unit_name):
-    system_dir = '/etc/systemd/system/'
-    prefix = "houston_scheduler_"
-    suffix = '.service'
-    
-    # Check for service file presence
-    for file in os.listdir(system_dir):
-        if file.startswith(prefix) and file.endswith(suffix):
-            base_name = file[:file.rfind('.')]
-            if base_name == unit_name:
-                return True
-    return False
+        print(f"Failed to reload systemd: {e}", file=sys.stderr)
+
+    started = found
+    result = subprocess.run(['sudo', 'systemctl', 'start'] + services, stderr=subprocess.PIPE, universal_newlines=True)
+    if result.returncode != 0:
+        # find out which ones failed from their state instead of starting them again
+        state = subprocess.run(
+            ['sudo', 'systemctl', 'show', '-p', 'Id,Result'] + services,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True
+        )
+        failed = set()
+        for block in state.stdout.split('\n\n'):
+            props = dict(line.split('=', 1) for line in block.splitlines() if '=' in line)
+            if props.get('Result', 'success') != 'success':
+                failed.add(props.get('Id', '')[:-len('.service')])
+        if not failed:
+            failed = set(found)
+        for unit_name in failed:
+            errors[unit_name] = f"Failed to run task: {result.stderr.strip()}"
+        started = [unit_name for unit_name in found if unit_name not in failed]
+
+    return {"success": not errors, "started": started, "errors": errors}
 
 def main():
-    unit_name = sys.argv[1]
-    
-    if check_for_service_file(unit_name):
-        run_task_now(unit_name)
-    else:
-        print(f'error: could not find task service file')
-    
+    unit_names = list(dict.fromkeys(sys.argv[1:]))
+    if not unit_names:
+        print(f"usage: {sys.argv[0]} UNIT_NAME [UNIT_NAME ...]", file=sys.stderr)
+        sys.exit(2)
+
+    result = run_tasks_now(unit_names)
+    print(json.dumps(result))
+    if not result['success']:
+        sys.exit(1)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,86 @@
+# ScheduleSpec, forecast_schedules(), find_contention() and HEAVY_TEMPLATES come from
+# scripts/task_schedule.py, which helpers.ts prepends to this script.
+import os
+import re
+import sys
+import json
+import argparse
+import datetime
+
+SYSTEM_DIR = '/etc/systemd/system'
+SCHEDULE_FILE_RE = re.compile(r"^houston_scheduler_([^_]+)_(.*)\.json$")
+
+
+def load_installed_schedules(system_dir):
+    """[{"name", "template", "schedule"}] from the schedule .json of every task"""
+    tasks = []
+    with os.scandir(system_dir) as entries:
+        for entry in entries:
+            match = SCHEDULE_FILE_RE.match(entry.name)
+            if not match:
+                continue
+            template, name = match.groups()
+            try:
+                with open(entry.path, 'r') as schedule_file:
+                    schedule = json.load(schedule_file)
+            except (OSError, ValueError):
+                continue
+            tasks.append({'name': name, 'template': template, 'schedule': schedule})
+    tasks.sort(key=lambda task: (task['template'], task['name']))
+    return tasks
+
+
+def load_tasks(tasks_path):
+    if tasks_path == '-':
+        return json.load(sys.stdin)
+    with open(tasks_path, 'r') as tasks_file:
+        return json.load(tasks_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Forecast when scheduler tasks fire and flag heavy tasks starting together')
+    parser.add_argument('-t', '--tasks', type=str, help='JSON list of {"name", "template", "schedule"} to forecast, "-" for stdin (installed tasks by default)')
+    parser.add_argument('-c', '--count', type=int, default=5, help='number of upcoming fire times per task (5 by default)')
+    parser.add_argument('-H', '--horizon', type=float, default=168, help='hours ahead to check for contention (168 by default)')
+    parser.add_argument('-w', '--window', type=float, default=60, help='minutes within which heavy tasks count as overlapping (60 by default)')
+    parser.add_argument('-m', '--max-concurrent', type=int, default=1, help='heavy tasks allowed to start in one window (1 by default)')
+    parser.add_argument('--heavy', type=str, default=','.join(HEAVY_TEMPLATES), help='comma-separated templates considered heavy')
+    args = parser.parse_args()
+
+    if args.count < 0 or args.horizon <= 0 or args.window <= 0 or args.max_concurrent < 1:
+        parser.error("--count must be >= 0, --horizon and --window > 0, --max-concurrent >= 1")
+
+    try:
+        tasks = load_tasks(args.tasks) if args.tasks else load_installed_schedules(SYSTEM_DIR)
+    except (OSError, ValueError) as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
+
+    now = datetime.datetime.now().replace(microsecond=0)
+    until = now + datetime.timedelta(hours=args.horizon)
+    forecasts = forecast_schedules(tasks, now, until, args.count)
+    contention = find_contention(
+        forecasts,
+        datetime.timedelta(minutes=args.window),
+        args.max_concurrent,
+        tuple(template for template in args.heavy.split(',') if template),
+    )
+
+    for forecast in forecasts:
+        forecast.pop('events', None)
+        forecast['next'] = [fire_time.isoformat() for fire_time in forecast['next']]
+    for window in contention:
+        window['start'] = window['start'].isoformat()
+        window['end'] = window['end'].isoformat()
+
+    print(json.dumps({
+        "success": True,
+        "generated": now.isoformat(),
+        "until": until.isoformat(),
+        "tasks": forecasts,
+        "contention": contention,
+    }))
+
+
+if __name__ == "__main__":
+    main()
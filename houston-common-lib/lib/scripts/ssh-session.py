@@ -0,0 +1,35 @@
+# ssh_destination() and ssh_session_open/close/status() come from
+# scripts/ssh_session.py, which helpers.ts prepends to this script.
+import sys
+import json
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Open, close or check the shared SSH session to a remote system')
+    parser.add_argument('action', type=str, choices=['open', 'close', 'status'], help='what to do with the session')
+    parser.add_argument('host', type=str, help='hostname of remote system')
+    parser.add_argument('-p', '--port', type=str, default='22', help='port to connect via ssh (22 by default)')
+    parser.add_argument('-u', '--user', type=str, default='root', help='user of remote system (root by default)')
+    parser.add_argument('--persist', type=int, default=SSH_CONTROL_PERSIST, help=f'seconds an idle session stays open ({SSH_CONTROL_PERSIST} by default)')
+    args = parser.parse_args()
+
+    destination = ssh_destination(args.host, args.user)
+    error = None
+    try:
+        if args.action == 'open':
+            error = ssh_session_open(destination, args.port, args.persist)
+        elif args.action == 'close':
+            ssh_session_close(destination, args.port)
+        active = ssh_session_status(destination, args.port)
+    except OSError as e:
+        error = str(e)
+        active = False
+
+    print(json.dumps({"success": error is None, "active": active, "error": error}))
+    if error is not None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
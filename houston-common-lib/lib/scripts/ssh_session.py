@@ -0,0 +1,107 @@
+import os
+import fcntl
+import hashlib
+import tempfile
+import contextlib
+import subprocess
+
+# Shared SSH sessions: one ControlMaster connection per user@host:port, reused by
+# every ssh call made through ssh_command() until it has been idle for
+# SSH_CONTROL_PERSIST seconds. Prepended by helpers.ts to the scripts that use it.
+
+SSH_CONTROL_DIR = '/run/houston/ssh'
+SSH_CONTROL_PERSIST = 600
+SSH_CONNECT_TIMEOUT = 10
+
+
+def ssh_control_dir():
+    """Directory holding the control sockets, only accessible to the current user"""
+    if os.geteuid() == 0:
+        control_dir = SSH_CONTROL_DIR
+    else:
+        runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+        control_dir = os.path.join(runtime_dir, f'houston-ssh-{os.geteuid()}')
+    os.makedirs(control_dir, mode=0o700, exist_ok=True)
+    return control_dir
+
+
+def ssh_destination(host, user=None):
+    return f"{user}@{host}" if user else host
+
+
+def ssh_options(port='22'):
+    # %C is a hash of local host, remote host, port and user, so each
+    # user@host:port gets its own socket and the path stays short
+    options = ['-o', f'ControlPath={os.path.join(ssh_control_dir(), "%C")}']
+    if port and str(port) != '22':
+        options.extend(['-p', str(port)])
+    return options
+
+
+def ssh_session_status(destination, port='22'):
+    """Whether a master connection to destination is up"""
+    result = subprocess.run(
+        ['ssh'] + ssh_options(port) + ['-O', 'check', destination],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return result.returncode == 0
+
+
+@contextlib.contextmanager
+def ssh_session_lock(destination, port='22'):
+    """Hold an flock for the session of destination. Two callers that both find no
+    master would both start one; the second can't take the control socket and
+    stays up as a plain connection that never exits."""
+    key = hashlib.sha1(f"{destination}:{port or '22'}".encode()).hexdigest()
+    lock_fd = os.open(os.path.join(ssh_control_dir(), f'{key}.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+    with os.fdopen(lock_fd, 'r+') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def ssh_session_open(destination, port='22', persist=SSH_CONTROL_PERSIST):
+    """Start a background master connection unless one is up already.
+    Returns None on success, or ssh's error message."""
+    with ssh_session_lock(destination, port):
+        if ssh_session_status(destination, port):
+            return None
+        # the backgrounded master keeps its stdio open, so its stderr goes to a file
+        # instead of a pipe that would never reach EOF
+        with tempfile.TemporaryFile(mode='w+') as stderr:
+            result = subprocess.run(
+                ['ssh'] + ssh_options(port) + [
+                    '-o', 'ControlMaster=yes',
+                    '-o', f'ControlPersist={persist}',
+                    '-o', 'BatchMode=yes',
+                    '-o', f'ConnectTimeout={SSH_CONNECT_TIMEOUT}',
+                    '-f', '-N', destination,
+                ],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=stderr
+            )
+            if result.returncode != 0:
+                stderr.seek(0)
+                return stderr.read().strip() or f"ssh exited with {result.returncode}"
+    return None
+
+
+def ssh_session_close(destination, port='22'):
+    """Stop the master connection to destination; True if one was running"""
+    if not ssh_session_status(destination, port):
+        return False
+    result = subprocess.run(
+        ['ssh'] + ssh_options(port) + ['-O', 'exit', destination],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return result.returncode == 0
+
+
+def ssh_command(destination, argv, port='22'):
+    """ssh argv running remote command argv over the shared session of destination.
+    If no session can be opened, the command still runs over a connection of its own."""
+    try:
+        ssh_session_open(destination, port)
+    except OSError:
+        pass
+    # ControlMaster=no still uses a running master, but never makes this call
+    # become one, which would leave the caller's pipes open after it exits
+    return ['ssh'] + ssh_options(port) + ['-o', 'ControlMaster=no', destination] + list(argv)
@@ -0,0 +1,20 @@
+import subprocess
+
+# Batched systemctl calls for scheduler task units. Prepended by helpers.ts to
+# the scripts that use it.
+
+
+def systemctl_units(action, units):
+    """Run one `systemctl action units...`; if that fails, retry unit by unit to find
+    which ones failed. Returns {unit: error} for the failures."""
+    if not units:
+        return {}
+    result = subprocess.run(['sudo', 'systemctl', action] + units, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    if result.returncode == 0:
+        return {}
+    errors = {}
+    for unit in units:
+        result = subprocess.run(['sudo', 'systemctl', action, unit], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+        if result.returncode != 0:
+            errors[unit] = result.stderr.strip() or f"systemctl {action} exited with {result.returncode}"
+    return errors
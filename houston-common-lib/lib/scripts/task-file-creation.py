@@ -1,14 +1,20 @@
+# interval_to_on_calendar() and ScheduleError come from scripts/task_schedule.py,
+# and systemctl_units() from scripts/systemd_units.py, which helpers.ts prepends
+# to this script.
 import re
 import subprocess
 import argparse
 import json
+import hashlib
 import os
+import sys
 import logging
 import configparser
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 SCHEDULER_CONF_PATH = "/opt/45drives/houston/scheduler/scheduler.conf"
+TASK_SERVICE_TEMPLATE_PATH = "/opt/45drives/houston/scheduler/templates/Task.service"
 
 RETRY_DEFAULTS = {
     "restart_sec": 5,
@@ -31,6 +37,150 @@ def get_retry_settings():
         "start_limit_interval_sec": start_limit_interval_sec,
     }
 
+# ${VAR} is a systemd environment reference, not a placeholder
+PLACEHOLDER_RE = re.compile(r"(?<!\$)\{(\w+)\}")
+
+
+class TemplatePlan:
+    """A unit template split once into literal text and {placeholder} names, so each
+    render is a single pass and values are never re-scanned for placeholders"""
+
+    def __init__(self, content):
+        parts = PLACEHOLDER_RE.split(content)
+        self.literals = parts[0::2]
+        self.names = parts[1::2]
+
+    def render(self, values):
+        """(rendered content, placeholders left unfilled); unfilled ones are kept verbatim"""
+        out = [self.literals[0]]
+        unfilled = []
+        for name, literal in zip(self.names, self.literals[1:]):
+            value = values.get(name)
+            if value is None:
+                if name not in unfilled:
+                    unfilled.append(name)
+                out.append("{" + name + "}")
+            else:
+                out.append(str(value))
+            out.append(literal)
+        return "".join(out), unfilled
+
+
+_template_plans = {}
+
+
+def get_template_plan(template_file_path):
+    """Compiled plan for a template, cached per path until its mtime/size changes"""
+    st = os.stat(template_file_path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _template_plans.get(template_file_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    plan = TemplatePlan(read_template_file(template_file_path))
+    _template_plans[template_file_path] = (key, plan)
+    return plan
+
+
+def render_template(template_file_path, values, unit_name):
+    content, unfilled = get_template_plan(template_file_path).render(values)
+    if unfilled:
+        logging.warning(f"{unit_name}: unfilled placeholders in {template_file_path}: {', '.join(unfilled)}")
+    return content, unfilled
+
+ADMISSION_DEFAULTS = {
+    "enabled": False,
+    "templates": "ZfsReplicationTask,ScrubTask,AutomatedSnapshotTask,RsyncTask,CloudSyncTask",
+    "slots_per_pool": 1,
+    "poll_sec": 15,
+    "lock_dir": "/run/houston/scheduler/admission",
+}
+
+POOL_NAME_RE = re.compile(r"^[A-Za-z0-9_.:-]+$")
+# fds the slot locks are held on, one per pool; 0-2 are stdio and systemd's own start at 3
+ADMISSION_FDS = range(8, 2, -1)
+
+
+def get_admission_settings():
+    """Read [admission] from scheduler.conf, falling back to defaults.
+    Per-pool slot counts can be set with `slots.<pool> = N`."""
+    config = configparser.ConfigParser()
+    # keep option names as written: pool names in `slots.<pool>` are case-sensitive
+    config.optionxform = str
+    if os.path.exists(SCHEDULER_CONF_PATH):
+        config.read(SCHEDULER_CONF_PATH)
+    section = "admission"
+    templates = config.get(section, "templates", fallback=ADMISSION_DEFAULTS["templates"])
+    pool_slots = {}
+    if config.has_section(section):
+        for key, value in config.items(section):
+            if key.startswith("slots."):
+                pool_slots[key[len("slots."):]] = int(value)
+    return {
+        "enabled": config.getboolean(section, "enabled", fallback=ADMISSION_DEFAULTS["enabled"]),
+        "templates": {template.strip() for template in templates.split(",") if template.strip()},
+        "slots_per_pool": config.getint(section, "slots_per_pool", fallback=ADMISSION_DEFAULTS["slots_per_pool"]),
+        "pool_slots": pool_slots,
+        "poll_sec": config.getint(section, "poll_sec", fallback=ADMISSION_DEFAULTS["poll_sec"]),
+        "lock_dir": config.get(section, "lock_dir", fallback=ADMISSION_DEFAULTS["lock_dir"]),
+    }
+
+def pool_of_path(path):
+    """ZFS pool a local path lives on, or None"""
+    try:
+        result = subprocess.run(['findmnt', '-n', '-o', 'SOURCE,FSTYPE', '--target', path], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    except OSError:
+        return None
+    fields = result.stdout.split()
+    if result.returncode != 0 or len(fields) != 2 or fields[1] != 'zfs':
+        return None
+    return fields[0].split('/')[0]
+
+def get_task_pools(parameters):
+    """Local pools a task does I/O on: every *_pool parameter whose matching *_host is
+    empty, plus the pool behind any *_local_path. Sorted, so tasks that need several
+    pools always take their slots in the same order."""
+    pools = set()
+    for key, value in parameters.items():
+        if not value:
+            continue
+        if key.endswith('_pool') and not parameters.get(key[:-len('_pool')] + '_host'):
+            pools.add(value)
+        elif key.endswith('_local_path'):
+            pool = pool_of_path(value)
+            if pool:
+                pools.add(pool)
+    return sorted(pool for pool in pools if POOL_NAME_RE.match(pool))
+
+def admission_wait_command(template_name, parameters):
+    """Shell snippet that blocks until the task holds a slot on each pool it uses, or ''.
+    A slot is a `flock -n` on one of N lock files per pool, held on an fd the task
+    inherits, so it is released when the task exits. ExecStart lines are subject to
+    systemd's $VAR expansion, so the attempts are unrolled instead of looping over
+    shell variables."""
+    admission = get_admission_settings()
+    if not admission["enabled"] or template_name not in admission["templates"]:
+        return ""
+    pools = get_task_pools(parameters)
+    lock_dir = admission["lock_dir"]
+    steps = [f"mkdir -p {lock_dir}"]
+    if len(pools) > len(ADMISSION_FDS):
+        logging.warning(
+            f"{template_name}: admission only covers {len(ADMISSION_FDS)} pools, "
+            f"not waiting for slots on {', '.join(pools[len(ADMISSION_FDS):])}"
+        )
+    for fd, pool in zip(ADMISSION_FDS, pools):
+        slots = max(1, admission["pool_slots"].get(pool, admission["slots_per_pool"]))
+        attempts = [f"{{ exec {fd}>{lock_dir}/{pool}.{slot}.lock && flock -n {fd}; }}" for slot in range(slots)]
+        try_once = " || ".join(attempts)
+        steps.append(
+            f"{{ {try_once} || {{ echo \"Waiting for a free {pool} slot (all {slots} in use)\" >&2; "
+            f"systemd-notify --status=\"Waiting for a free {pool} slot\" 2>/dev/null; "
+            f"until {try_once}; do sleep {admission['poll_sec']}; done; }}; }}"
+        )
+    if len(steps) == 1:
+        return ""
+    return "; ".join(steps) + "; "
+
 def read_template_file(template_file_path):
     logging.debug(f'Reading template file: {template_file_path}')
     with open(template_file_path, 'r') as file:
@@ -87,176 +237,283 @@ def read_schedule_json(file_path):
         logging.error(f"Error reading JSON from file {file_path}: {e}")
         return None
 
-def interval_to_on_calendar(interval):
-    logging.debug(f'Converting interval to OnCalendar format: {interval}')
-    parts = []
-    
-    if 'dayOfWeek' in interval and interval['dayOfWeek']:
-        day_of_week = ','.join(interval['dayOfWeek'])
-        parts.append(day_of_week)
-    
-    year_part = interval.get('year', {}).get('value', '*')
-    month_part = interval.get('month', {}).get('value', '*')
-    day_part = interval.get('day', {}).get('value', '*')
-    
-    # Modify the parts if they contain a slash and the base is not an asterisk
-    if '/' in day_part:
-        base, step = day_part.split('/')
-        if base == '*':
-            base = '1'  # Default to starting from the 1st day if base is '*'
-        day_part = f'{base}/{step}'
-    
-    date_part = f'{year_part}-{month_part}-{day_part}'
-    parts.append(date_part)
-    
-    hour = interval.get('hour', {}).get('value', '*')
-    minute = interval.get('minute', {}).get('value', '*')
-    second = interval.get('second', {}).get('value', '0')
-    
-    # Modify the parts if they contain a slash
-    if '/' in hour:
-        base, step = hour.split('/')
-        if base == '*':
-            base = '0'  # Default to starting from 0 if base is '*'
-        hour = f'{base}/{step}'
-    
-    if '/' in minute:
-        base, step = minute.split('/')
-        if base == '*':
-            base = '0'  # Default to starting from 0 if base is '*'
-        minute = f'{base}/{step}'
-    
-    time_part = f'{hour}:{minute}:{second}'
-    parts.append(time_part)
-    
-    on_calendar_value = ' '.join(parts)
-    
-    return 'OnCalendar=' + on_calendar_value
-
-def replace_placeholders(template_content, parameters):
-    logging.debug('Replacing placeholders in the template')
-    for key, value in parameters.items():
-        placeholder = "{" + key + "}"
-        template_content = template_content.replace(placeholder, value)
-    return template_content
+def file_sha256(file_path):
+    try:
+        with open(file_path, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except FileNotFoundError:
+        return None
 
 def generate_concrete_file(template_content, output_file_path):
+    """Write via a temp file + rename so systemd never sees a half-written unit.
+    Nothing is written when the content on disk already matches.
+    Returns 'unchanged', 'created' or 'updated'."""
     logging.debug(f'Generating concrete file at: {output_file_path}')
-    with open(output_file_path, 'w') as file:
-        file.write(template_content)
+    current_hash = file_sha256(output_file_path)
+    if current_hash == hashlib.sha256(template_content.encode()).hexdigest():
+        logging.debug('Concrete file is unchanged, not rewriting it')
+        return 'unchanged'
+    tmp_path = os.path.join(os.path.dirname(output_file_path), f'.{os.path.basename(output_file_path)}.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'w') as file:
+            file.write(template_content)
+        os.replace(tmp_path, output_file_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
     logging.debug('Concrete file generated successfully')
+    return 'created' if current_hash is None else 'updated'
+
+def daemon_reload():
+    try:
+        subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Failed to reload systemd: {e}")
+
+def get_enabled_units(units):
+    """Subset of units that are already enabled, from one `systemctl show`. Its output
+    is keyed by Id; `is-enabled` prints nothing on stdout for a unit it can't
+    resolve, so its lines can't be matched to units by position."""
+    if not units:
+        return set()
+    result = subprocess.run(['sudo', 'systemctl', 'show', '-p', 'Id,UnitFileState'] + units, universal_newlines=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    enabled = set()
+    for block in result.stdout.split('\n\n'):
+        props = dict(line.split('=', 1) for line in block.splitlines() if '=' in line)
+        if props.get('UnitFileState') == 'enabled':
+            enabled.add(props.get('Id'))
+    return enabled & set(units)
 
 def manage_service(unit_name, action):
     logging.debug(f'Managing service: {unit_name} with action: {action}')
     try:
-        subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
         subprocess.run(['sudo', 'systemctl', action, unit_name], check=True)
         logging.debug(f'{unit_name} has been {action}d')
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to {action} {unit_name}: {e}")
 
-def start_timer(timer_name):
+def start_timer(timer_name, restart=True):
+    """Enable the timer (only if it isn't already, enabling reloads systemd) and start it.
+    It is only restarted when its unit file changed."""
     logging.debug(f'Starting timer: {timer_name}')
     try:
-        subprocess.run(['sudo', 'systemctl', 'daemon-reload'], check=True)
-
-        result = subprocess.run(['sudo', 'systemctl', 'is-enabled', timer_name], universal_newlines=True, stdout=subprocess.PIPE)
-        
-        if result.stdout.strip() == 'enabled':
-            logging.debug(f'Timer {timer_name} is active, restarting it')
+        if timer_name not in get_enabled_units([timer_name]):
+            manage_service(timer_name, 'enable')
+        if restart:
+            logging.debug(f'Timer {timer_name} changed, restarting it')
             subprocess.run(['sudo', 'systemctl', 'restart', timer_name], check=True)
             logging.debug(f'{timer_name} has been restarted')
         else:
-            logging.debug(f'Timer {timer_name} is inactive, starting it')
+            # no-op if the timer is already running
             subprocess.run(['sudo', 'systemctl', 'start', timer_name], check=True)
             logging.debug(f'{timer_name} has been started')
     except subprocess.CalledProcessError as e:
         logging.error(f"Failed to start {timer_name}: {e}")
 
-def create_task(template_name, script_path, param_env_path):
-    logging.debug(f'Creating task with service template: {template_name} and env file: {param_env_path}')
+def unit_name_from_env_path(param_env_path):
     param_env_filename = os.path.basename(param_env_path)
     parts = param_env_filename.split('_')
     task_instance_name = '_'.join(parts[2:]).split('.env')[0]
-    service_file_name = f'houston_scheduler_{task_instance_name}.service'
-    output_path_service = f'/etc/systemd/system/{service_file_name}'
+    return f"houston_scheduler_{task_instance_name}"
+
+def render_task_service(template_name, script_path, param_env_path):
+    """(full unit name, rendered .service content, unfilled placeholders)"""
+    logging.debug(f'Creating task with service template: {template_name} and env file: {param_env_path}')
+    full_unit_name = unit_name_from_env_path(param_env_path)
+    task_instance_name = full_unit_name[len("houston_scheduler_"):]
     
-    service_template_content = read_template_file('/opt/45drives/houston/scheduler/templates/Task.service')
     parameters = parse_env_file(param_env_path)
     exec_start_command = generate_exec_start(template_name, parameters, script_path)
-    service_template_content = service_template_content.replace("{task_name}", task_instance_name)
-    service_template_content = service_template_content.replace("{env_path}", param_env_path)
-    # Wrap with flock to prevent concurrent runs of the same task
+    # Wrap with flock to prevent concurrent runs of the same task, then wait for
+    # an admission slot on the task's pools if [admission] is enabled
     locked_exec = (
         "/bin/sh -c 'exec 9>/run/%n.lock && flock -n 9 || "
         '{ echo "Already running, skipping." >&2; '
         'systemd-notify --status="Skipped: previous run still active" 2>/dev/null; '
-        "exit 0; }; exec " + exec_start_command + "'"
+        "exit 0; }; " + admission_wait_command(template_name, parameters) + "exec " + exec_start_command + "'"
     )
-    service_template_content = service_template_content.replace("{ExecStart}", locked_exec)
 
     # Apply retry settings from global config
     retry = get_retry_settings()
-    service_template_content = service_template_content.replace("{restart_sec}", str(retry["restart_sec"]))
-    service_template_content = service_template_content.replace("{start_limit_burst}", str(retry["start_limit_burst"]))
-    service_template_content = service_template_content.replace("{start_limit_interval_sec}", str(retry["start_limit_interval_sec"]))
-    
-    generate_concrete_file(service_template_content, output_path_service)
+    content, unfilled = render_template(TASK_SERVICE_TEMPLATE_PATH, {
+        "task_name": task_instance_name,
+        "env_path": param_env_path,
+        "ExecStart": locked_exec,
+        "restart_sec": retry["restart_sec"],
+        "start_limit_burst": retry["start_limit_burst"],
+        "start_limit_interval_sec": retry["start_limit_interval_sec"],
+    }, f"{full_unit_name}.service")
+    return full_unit_name, content, unfilled
+
+def create_task(template_name, script_path, param_env_path):
+    """Returns ({unit: 'unchanged'|'created'|'updated'}, {unit: unfilled placeholders});
+    the caller reloads systemd if needed"""
+    full_unit_name, service_template_content, unfilled = render_task_service(template_name, script_path, param_env_path)
+    status = generate_concrete_file(service_template_content, f'/etc/systemd/system/{full_unit_name}.service')
     logging.debug("Standalone concrete service file generated successfully.")
+    return {f'{full_unit_name}.service': status}, {f'{full_unit_name}.service': unfilled} if unfilled else {}
 
-def create_schedule(schedule_json_path, timer_template_path, full_unit_name):
+def render_schedule_timer(schedule_json_path, timer_template_path, full_unit_name):
+    """(rendered .timer content, unfilled placeholders), or None if the schedule JSON is unreadable"""
     logging.debug(f'Creating schedule with timer template: {timer_template_path} and schedule file: {schedule_json_path}')
-    output_path_timer = f"/etc/systemd/system/{full_unit_name}.timer"
     schedule_data = read_schedule_json(schedule_json_path)
     
     if not schedule_data:
         logging.error("Invalid schedule data.")
-        return
+        return None
 
-    timer_template_content = read_template_file(timer_template_path)
-    on_calendar_lines = [interval_to_on_calendar(interval) for interval in schedule_data['intervals']]
+    try:
+        on_calendar_lines = [interval_to_on_calendar(interval) for interval in schedule_data['intervals']]
+    except ScheduleError as e:
+        logging.error(f"Invalid schedule interval: {e}")
+        return None
     on_calendar_lines_str = "\n".join(on_calendar_lines)
-    timer_template_content = timer_template_content.replace("{description}", f"Timer for {full_unit_name}").replace("{on_calendar_lines}", on_calendar_lines_str)
-    
-    generate_concrete_file(timer_template_content, output_path_timer)
+    return render_template(timer_template_path, {
+        "description": f"Timer for {full_unit_name}",
+        "on_calendar_lines": on_calendar_lines_str,
+    }, f"{full_unit_name}.timer")
+
+def create_schedule(schedule_json_path, timer_template_path, full_unit_name, reload=False):
+    """Returns ({unit: 'unchanged'|'created'|'updated'}, {unit: unfilled placeholders}),
+    or None for invalid schedule data.
+    systemd is only reloaded when the timer (or, with reload, something else) changed,
+    and the timer is only restarted when it changed."""
+    rendered = render_schedule_timer(schedule_json_path, timer_template_path, full_unit_name)
+    if rendered is None:
+        return None
+    timer_template_content, unfilled = rendered
+
+    timer_name = f"{full_unit_name}.timer"
+    status = generate_concrete_file(timer_template_content, f"/etc/systemd/system/{timer_name}")
     logging.debug("Concrete timer file generated successfully.")
-    
-    manage_service(full_unit_name + '.timer', 'enable')
-    start_timer(full_unit_name + '.timer')
+
+    if reload or status != 'unchanged':
+        daemon_reload()
+    start_timer(timer_name, restart=status != 'unchanged')
+    return {timer_name: status}, {timer_name: unfilled} if unfilled else {}
+
+def read_manifest(manifest_path):
+    if manifest_path == '-':
+        manifest = json.load(sys.stdin)
+    else:
+        with open(manifest_path, 'r') as file:
+            manifest = json.load(file)
+    if isinstance(manifest, dict):
+        manifest = manifest.get('tasks', [])
+    if not isinstance(manifest, list):
+        raise ValueError("manifest must be a list of tasks or {\"tasks\": [...]}")
+    return manifest
+
+def apply_batch(manifest):
+    """Render and write the units of every manifest entry, then reload systemd once (if
+    anything changed) and enable/(re)start all timers with one systemctl call each.
+    Entries use the CLI's long option names: templateName, scriptPath and env for the
+    service, timerTemplate and schedule for the timer, name for schedule-only entries."""
+    results = []
+    timers = {}
+    for entry in manifest:
+        result = {"name": entry.get('name'), "success": False, "units": {}, "unfilled": {}, "error": None}
+        results.append(result)
+        try:
+            if entry.get('env'):
+                full_unit_name, service_content, unfilled = render_task_service(entry['templateName'], entry['scriptPath'], entry['env'])
+                result['name'] = full_unit_name
+                if unfilled:
+                    result['unfilled'][f'{full_unit_name}.service'] = unfilled
+                result['units'][f'{full_unit_name}.service'] = generate_concrete_file(service_content, f'/etc/systemd/system/{full_unit_name}.service')
+            elif not entry.get('name'):
+                raise ValueError("each task needs either env (with templateName and scriptPath) or name")
+            if entry.get('schedule'):
+                rendered = render_schedule_timer(entry['schedule'], entry['timerTemplate'], result['name'])
+                if rendered is None:
+                    raise ValueError(f"Invalid schedule data in {entry['schedule']}")
+                timer_content, unfilled = rendered
+                timer_name = f"{result['name']}.timer"
+                if unfilled:
+                    result['unfilled'][timer_name] = unfilled
+                result['units'][timer_name] = generate_concrete_file(timer_content, f'/etc/systemd/system/{timer_name}')
+                timers[timer_name] = result
+            result['success'] = True
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"Failed to create task files for {result['name']}: {e}")
+            result['error'] = str(e) if not isinstance(e, KeyError) else f"missing {e}"
+
+    if any(status != 'unchanged' for result in results for status in result['units'].values()):
+        daemon_reload()
+
+    enabled = get_enabled_units(list(timers))
+    to_enable = [unit for unit in timers if unit not in enabled]
+    for unit, error in systemctl_units('enable', to_enable).items():
+        timers[unit]['success'] = False
+        timers[unit]['error'] = f"enable failed: {error}"
+    # changed timers are restarted, unchanged ones only started if they aren't running
+    for action, restart in (('restart', True), ('start', False)):
+        units = [
+            unit for unit, result in timers.items()
+            if result['success'] and (result['units'][unit] != 'unchanged') == restart
+        ]
+        for unit, error in systemctl_units(action, units).items():
+            timers[unit]['success'] = False
+            timers[unit]['error'] = f"{action} failed: {error}"
+
+    return {"success": all(result['success'] for result in results), "tasks": results}
 
 def main():
     logging.debug('Starting main function')
     parser = argparse.ArgumentParser(description='Manage Service and Timer Files')
     parser.add_argument('-tN', '--templateName', type=str, help='Task Template Name')
-    parser.add_argument('-t', '--type', type=str, choices=['create-task', 'create-schedule', 'create-task-schedule'], required=True, help='Type of operation to perform')
+    parser.add_argument('-t', '--type', type=str, choices=['create-task', 'create-schedule', 'create-task-schedule', 'batch'], required=True, help='Type of operation to perform')
     parser.add_argument('-sP', '--scriptPath', type=str, help='Script Path')
     parser.add_argument('-e', '--env', type=str, help='Env file path')
     parser.add_argument('-tt', '--timerTemplate', type=str, help='Template timer file path')
     parser.add_argument('-s', '--schedule', type=str, help='Schedule JSON file path')
     parser.add_argument('-n', '--name', type=str, help='Full task/unit name (required for schedule)')
+    parser.add_argument('-m', '--manifest', type=str, help='JSON list of tasks to create in one go, "-" for stdin (required for batch)')
     
     args = parser.parse_args()
 
     if args.type == 'create-task':
         if not args.templateName or not args.scriptPath or not args.env:
             parser.error("the following arguments are required for create-task: -tN/--templateName, -sP/--scriptPath, -e/--env")
-        create_task(args.templateName, args.scriptPath, args.env)
+        units, unfilled = create_task(args.templateName, args.scriptPath, args.env)
+        if any(status != 'unchanged' for status in units.values()):
+            daemon_reload()
+        print(json.dumps({"units": units, "unfilled": unfilled}))
     elif args.type == 'create-schedule':
         if not args.timerTemplate or not args.schedule or not args.name:
             parser.error("the following arguments are required for create-schedule: -tt/--timerTemplate, -s/--schedule, -n/--name")
-        create_schedule(args.schedule, args.timerTemplate, args.name)
+        created = create_schedule(args.schedule, args.timerTemplate, args.name)
+        if created is None:
+            sys.exit(1)
+        units, unfilled = created
+        print(json.dumps({"units": units, "unfilled": unfilled}))
     elif args.type == 'create-task-schedule':
         if not args.templateName or not args.scriptPath or not args.env or not args.timerTemplate or not args.schedule:
             parser.error("the following arguments are required for create-task-schedule: -tN/--templateName, -sP/--scriptPath, -e/--env, -tt/--timerTemplate, -s/--schedule")
         
-        create_task(args.templateName, args.scriptPath, args.env)
-        
-        param_env_filename = os.path.basename(args.env)
-        parts = param_env_filename.split('_')
-        task_instance_name = '_'.join(parts[2:]).split('.env')[0]
-        full_unit_name = f"houston_scheduler_{task_instance_name}"
-        
-        create_schedule(args.schedule, args.timerTemplate, full_unit_name)
+        units, unfilled = create_task(args.templateName, args.scriptPath, args.env)
+        service_changed = any(status != 'unchanged' for status in units.values())
+        created = create_schedule(args.schedule, args.timerTemplate, unit_name_from_env_path(args.env), reload=service_changed)
+        if created is None:
+            if service_changed:
+                daemon_reload()
+            sys.exit(1)
+        units.update(created[0])
+        unfilled.update(created[1])
+        print(json.dumps({"units": units, "unfilled": unfilled}))
+    elif args.type == 'batch':
+        if not args.manifest:
+            parser.error("the following arguments are required for batch: -m/--manifest")
+        try:
+            manifest = read_manifest(args.manifest)
+        except (OSError, ValueError) as e:
+            print(json.dumps({"success": False, "tasks": [], "error": str(e)}))
+            sys.exit(1)
+        result = apply_batch(manifest)
+        print(json.dumps(result))
+        if not result['success']:
+            sys.exit(1)
     logging.debug('Main function execution completed')
         
 if __name__ == "__main__":
@@ -0,0 +1,285 @@
+import os
+import re
+import sys
+import json
+import math
+import sqlite3
+import argparse
+import subprocess
+
+HISTORY_DB_PATH = '/var/lib/houston/scheduler/history.db'
+UNIT_PATTERN = 'houston_scheduler_*'
+UNIT_RE = re.compile(r"^houston_scheduler_([^_]+)_(.*)\.service$")
+
+# systemd catalog message IDs logged by PID 1 about units
+MESSAGE_UNIT_STARTING = '7d4958e842da4a758f6c1cdc7b36dcc5'
+MESSAGE_UNIT_STARTED = '39f53479d3a045ac8e11786248231fbf'  # JOB_DONE, "Finished" for oneshot units
+MESSAGE_UNIT_SUCCESS = '7ad2d189f7e94e70a38c781354912448'
+MESSAGE_UNIT_FAILED = 'be02cf6855d2428ba40df7e9d022f03d'
+MESSAGE_UNIT_STOPPED = '9d1aaa27d60140bd96365438aad20286'
+MESSAGE_UNIT_PROCESS_EXIT = '98e322203f7a4ed290d09fe03c09fe15'
+MESSAGE_UNIT_RESOURCES = 'ae8f7b866b0347b9af31fe1c80b127c0'
+
+SIZE_UNITS = {
+    '': 1, 'b': 1, 'byte': 1, 'bytes': 1,
+    'k': 1000, 'kb': 1000, 'kib': 1024, 'kibyte': 1024,
+    'm': 1000 ** 2, 'mb': 1000 ** 2, 'mib': 1024 ** 2, 'mibyte': 1024 ** 2,
+    'g': 1000 ** 3, 'gb': 1000 ** 3, 'gib': 1024 ** 3, 'gibyte': 1024 ** 3,
+    't': 1000 ** 4, 'tb': 1000 ** 4, 'tib': 1024 ** 4, 'tibyte': 1024 ** 4,
+}
+
+# each pattern captures a number and its unit ("" for plain bytes)
+BYTES_PATTERNS = [
+    # rsync --stats / summary line
+    re.compile(r"Total bytes sent:\s*([\d,.]+)()"),
+    re.compile(r"^sent ([\d,.]+) (bytes)\s+received"),
+    # rclone progress/summary: "Transferred:   1.234 GiB / 1.234 GiB, 100%, ..."
+    re.compile(r"Transferred:\s+([\d.]+)\s*([KMGT]i?B|B)\s*/"),
+    # mbuffer summary on zfs send | mbuffer pipelines
+    re.compile(r"summary:\s+([\d.]+)\s*([kMGT]i?Byte)"),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    invocation_id TEXT PRIMARY KEY,
+    unit TEXT NOT NULL,
+    template TEXT NOT NULL,
+    task_name TEXT NOT NULL,
+    start_usec INTEGER,
+    end_usec INTEGER,
+    exit_code INTEGER,
+    result TEXT,
+    bytes_transferred INTEGER,
+    io_read_bytes INTEGER,
+    io_write_bytes INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_unit_start ON runs (unit, start_usec);
+CREATE INDEX IF NOT EXISTS runs_start ON runs (start_usec);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def open_db(db_path):
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    db = sqlite3.connect(db_path)
+    db.row_factory = sqlite3.Row
+    db.executescript(SCHEMA)
+    return db
+
+
+def parse_size(number, unit):
+    value = float(number.replace(',', ''))
+    return int(value * SIZE_UNITS.get(unit.lower(), 1))
+
+
+def bytes_from_message(message):
+    for pattern in BYTES_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            try:
+                return parse_size(match.group(1), match.group(2))
+            except ValueError:
+                # e.g. a version string that happens to follow the label
+                return None
+    return None
+
+
+def message_text(fields):
+    message = fields.get('MESSAGE', '')
+    if isinstance(message, list):
+        message = bytes(message).decode('utf-8', errors='replace')
+    return message or ''
+
+
+class HistoryIngest:
+    """Folds journal entries of scheduler units into one `runs` row per invocation"""
+
+    def __init__(self, db):
+        self.db = db
+        self.runs = {}
+
+    def run_for(self, invocation_id, unit):
+        run = self.runs.get(invocation_id)
+        if run is None:
+            row = self.db.execute('SELECT * FROM runs WHERE invocation_id = ?', (invocation_id,)).fetchone()
+            if row is not None:
+                run = dict(row)
+            else:
+                template, task_name = UNIT_RE.match(unit).groups()
+                run = {
+                    'invocation_id': invocation_id, 'unit': unit[:-len('.service')], 'template': template, 'task_name': task_name,
+                    'start_usec': None, 'end_usec': None, 'exit_code': None, 'result': None,
+                    'bytes_transferred': None, 'io_read_bytes': None, 'io_write_bytes': None,
+                }
+            self.runs[invocation_id] = run
+        return run
+
+    def add(self, fields):
+        unit = fields.get('_SYSTEMD_UNIT') if fields.get('_PID') != '1' else None
+        unit = unit or fields.get('UNIT')
+        invocation_id = fields.get('_SYSTEMD_INVOCATION_ID') or fields.get('INVOCATION_ID')
+        if not unit or not invocation_id or not UNIT_RE.match(unit):
+            return
+        run = self.run_for(invocation_id, unit)
+        timestamp = int(fields.get('__REALTIME_TIMESTAMP', 0))
+        message_id = fields.get('MESSAGE_ID')
+
+        if run['start_usec'] is None or (message_id == MESSAGE_UNIT_STARTING and timestamp < run['start_usec']):
+            run['start_usec'] = timestamp
+
+        if message_id == MESSAGE_UNIT_PROCESS_EXIT and fields.get('EXIT_STATUS', '').lstrip('-').isdigit():
+            run['exit_code'] = int(fields['EXIT_STATUS'])
+        elif message_id == MESSAGE_UNIT_SUCCESS:
+            run['end_usec'] = timestamp
+            run['result'] = 'success'
+            if run['exit_code'] is None:
+                run['exit_code'] = 0
+        elif message_id == MESSAGE_UNIT_FAILED:
+            run['end_usec'] = timestamp
+            run['result'] = fields.get('UNIT_RESULT', 'failed')
+        elif message_id == MESSAGE_UNIT_STARTED and fields.get('JOB_TYPE') == 'start':
+            # oneshot units are "started" once they have finished running
+            if fields.get('JOB_RESULT') == 'done' and run['result'] is None:
+                run['end_usec'] = timestamp
+                run['result'] = 'success'
+                if run['exit_code'] is None:
+                    run['exit_code'] = 0
+        elif message_id == MESSAGE_UNIT_STOPPED and run['end_usec'] is None:
+            run['end_usec'] = timestamp
+        elif message_id == MESSAGE_UNIT_RESOURCES:
+            for field, key in (('IO_METRIC_READ_BYTES', 'io_read_bytes'), ('IO_METRIC_WRITE_BYTES', 'io_write_bytes')):
+                if fields.get(field, '').isdigit():
+                    run[key] = int(fields[field])
+        elif not message_id:
+            transferred = bytes_from_message(message_text(fields))
+            if transferred is not None:
+                run['bytes_transferred'] = transferred
+
+    def flush(self):
+        for run in self.runs.values():
+            self.db.execute(
+                'INSERT OR REPLACE INTO runs (invocation_id, unit, template, task_name, start_usec, end_usec, exit_code, '
+                'result, bytes_transferred, io_read_bytes, io_write_bytes) VALUES (:invocation_id, :unit, :template, '
+                ':task_name, :start_usec, :end_usec, :exit_code, :result, :bytes_transferred, :io_read_bytes, :io_write_bytes)',
+                run,
+            )
+        self.runs = {}
+
+
+def ingest(db, batch_size=5000):
+    """Read journal entries of scheduler units written since the last ingest. The
+    cursor is committed together with the runs, so an interrupted ingest resumes."""
+    row = db.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+    cmd = ['journalctl', '-o', 'json', '--no-pager', '--all', '-u', UNIT_PATTERN]
+    if row is not None:
+        cmd.extend(['--after-cursor', row['value']])
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True)
+    history = HistoryIngest(db)
+    count = 0
+    cursor = None
+    try:
+        for line in proc.stdout:
+            if not line.strip():
+                continue
+            fields = json.loads(line)
+            history.add(fields)
+            cursor = fields['__CURSOR']
+            count += 1
+            if count % batch_size == 0:
+                with db:
+                    history.flush()
+                    db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('cursor', ?)", (cursor,))
+    finally:
+        # journalctl would block on a full pipe if the loop stopped early
+        proc.terminate()
+        proc.wait()
+    if cursor is not None:
+        with db:
+            history.flush()
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('cursor', ?)", (cursor,))
+    return count
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def task_stats(db, unit, window, limit):
+    finished = db.execute(
+        'SELECT (end_usec - start_usec) AS duration, exit_code, result, bytes_transferred FROM runs '
+        'WHERE unit = ? AND end_usec IS NOT NULL AND start_usec IS NOT NULL ORDER BY start_usec DESC LIMIT ?',
+        (unit, window),
+    ).fetchall()
+    durations = sorted(row['duration'] / 1e6 for row in finished)
+    throughputs = sorted(
+        row['bytes_transferred'] / (row['duration'] / 1e6) for row in finished
+        if row['bytes_transferred'] and row['duration'] > 0
+    )
+    runs = db.execute(
+        'SELECT invocation_id, start_usec, end_usec, exit_code, result, bytes_transferred, io_read_bytes, io_write_bytes '
+        'FROM runs WHERE unit = ? ORDER BY start_usec DESC LIMIT ?',
+        (unit, limit),
+    ).fetchall()
+    template, task_name = UNIT_RE.match(unit + '.service').groups()
+    return {
+        'unit': unit,
+        'template': template,
+        'name': task_name,
+        'runs': [
+            {
+                'invocationId': run['invocation_id'],
+                'start': run['start_usec'],
+                'end': run['end_usec'],
+                'duration': (run['end_usec'] - run['start_usec']) / 1e6 if run['end_usec'] and run['start_usec'] else None,
+                'exitCode': run['exit_code'],
+                'result': run['result'],
+                'bytesTransferred': run['bytes_transferred'],
+                'ioReadBytes': run['io_read_bytes'],
+                'ioWriteBytes': run['io_write_bytes'],
+            }
+            for run in runs
+        ],
+        'finishedRuns': len(finished),
+        'successRate': (sum(1 for row in finished if row['result'] == 'success') / len(finished)) if finished else None,
+        'durationP50': percentile(durations, 0.5),
+        'durationP95': percentile(durations, 0.95),
+        'throughputP50': percentile(throughputs, 0.5),
+        'throughputP95': percentile(throughputs, 0.95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scheduler task run history, ingested incrementally from the journal')
+    parser.add_argument('units', nargs='*', help='full task unit names (all tasks with history by default)')
+    parser.add_argument('--db', type=str, default=HISTORY_DB_PATH, help=f'history database ({HISTORY_DB_PATH} by default)')
+    parser.add_argument('-n', '--limit', type=int, default=20, help='most recent runs listed per task (20 by default)')
+    parser.add_argument('-w', '--window', type=int, default=100, help='most recent finished runs used for percentiles (100 by default)')
+    parser.add_argument('--no-ingest', action='store_true', help='answer from the store without reading new journal entries')
+    parser.add_argument('--ingest-only', action='store_true', help='only read new journal entries into the store')
+    args = parser.parse_args()
+
+    try:
+        db = open_db(args.db)
+        ingested = 0 if args.no_ingest else ingest(db)
+        if args.ingest_only:
+            print(json.dumps({"success": True, "ingested": ingested}))
+            return
+        units = args.units or [row['unit'] for row in db.execute('SELECT DISTINCT unit FROM runs ORDER BY unit')]
+        units = [unit[:-len('.service')] if unit.endswith('.service') else unit for unit in units]
+        tasks = [task_stats(db, unit, args.window, args.limit) for unit in units if UNIT_RE.match(unit + '.service')]
+    except (OSError, sqlite3.Error) as e:
+        print(json.dumps({"success": False, "error": str(e)}))
+        sys.exit(1)
+
+    print(json.dumps({"success": True, "ingested": ingested, "tasks": tasks}))
+
+
+if __name__ == "__main__":
+    main()
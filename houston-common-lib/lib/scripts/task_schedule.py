@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# Scheduler interval validation, OnCalendar generation and fire-time forecasting.
+# Scripts run through `python3 -c`, so callers prepend this file to the script
+# source (see scheduler/utils/helpers.ts) instead of importing it.
+# Keep it free of side effects at import time.
+import calendar
+import datetime
+import heapq
+import logging
+import itertools
+
+DAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']  # datetime.weekday() order
+
+FIELD_RANGES = {
+    'year': (1970, 2199),
+    'month': (1, 12),
+    'day': (1, 31),
+    'hour': (0, 23),
+    'minute': (0, 59),
+    'second': (0, 59),
+}
+
+# first value of a '*/STEP' repetition, as interval_to_on_calendar writes it
+STEP_BASES = {'day': '1', 'hour': '0', 'minute': '0'}
+
+HEAVY_TEMPLATES = ('ScrubTask', 'ZfsReplicationTask')
+
+LAST_FIRE_TIME = datetime.datetime(FIELD_RANGES['year'][1], 12, 31, 23, 59, 59)
+
+
+class ScheduleError(ValueError):
+    pass
+
+
+class UnknownScheduleSyntax(ScheduleError):
+    """A field uses OnCalendar syntax this module doesn't model; systemd may still accept it"""
+
+
+def parse_field(value, field):
+    """Values a schedule field matches, sorted; '*' matches the whole range.
+    Accepts N, A..B, lists of those, and BASE/STEP, A..B/STEP or */STEP repetitions."""
+    low, high = FIELD_RANGES[field]
+    value = str(value).strip()
+    if value == '*':
+        return list(range(low, high + 1))
+    values = set()
+    for part in value.split(','):
+        try:
+            if '/' in part:
+                base, step = part.split('/', 1)
+                if base == '*':
+                    start, stop = low, high
+                elif '..' in base:
+                    start, stop = (int(bound) for bound in base.split('..', 1))
+                    if stop < start:
+                        raise ScheduleError(f"{field}: empty range in {value!r}")
+                else:
+                    start, stop = int(base), high
+                step = int(step)
+                if step < 1:
+                    raise ScheduleError(f"{field}: step must be at least 1 in {value!r}")
+                values.update(range(start, stop + 1, step))
+                end = stop if '..' in base else start
+            elif '..' in part:
+                start, end = (int(bound) for bound in part.split('..', 1))
+                if end < start:
+                    raise ScheduleError(f"{field}: empty range in {value!r}")
+                values.update(range(start, end + 1))
+            else:
+                start = end = int(part)
+                values.add(start)
+        except ValueError as e:
+            if isinstance(e, ScheduleError):
+                raise
+            raise UnknownScheduleSyntax(f"{field}: unrecognized value {value!r}")
+        if start < low or end > high:
+            raise ScheduleError(f"{field}: {value!r} is outside {low}-{high}")
+    return sorted(values)
+
+
+def parse_days_from_end(value):
+    """Split a day field into its '~N' parts (N-th last day of the month, as N)
+    and the rest of the field, or None when nothing else is left"""
+    from_end = []
+    rest = []
+    for part in str(value).split(','):
+        part = part.strip()
+        if not part.startswith('~'):
+            rest.append(part)
+            continue
+        try:
+            days = int(part[1:])
+        except ValueError:
+            raise UnknownScheduleSyntax(f"day: unrecognized value {value!r}")
+        if not 1 <= days <= 31:
+            raise ScheduleError(f"day: {value!r} is outside ~1-~31")
+        from_end.append(days)
+    return from_end, ','.join(rest) or None
+
+
+class ScheduleSpec:
+    """One schedule interval compiled into the sets of values it fires on"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        values = {
+            field: interval.get(field, {}).get('value', '0' if field == 'second' else '*')
+            for field in FIELD_RANGES
+        }
+        self.days_from_end, values['day'] = parse_days_from_end(values['day'])
+        self.fields = {
+            field: parse_field(value, field) if value is not None else []
+            for field, value in values.items()
+        }
+        days_of_week = interval.get('dayOfWeek') or []
+        unknown = [day for day in days_of_week if day not in DAY_NAMES]
+        if unknown:
+            raise ScheduleError(f"dayOfWeek: unknown day(s) {', '.join(unknown)}")
+        self.weekdays = {DAY_NAMES.index(day) for day in days_of_week} or None
+        if not self.days_from_end and not any(day <= 29 for day in self.fields['day']) and self.fields['month'] == [2]:
+            raise ScheduleError("day: February never has that day")
+
+    def iter_fire_times(self, after, until):
+        """Fire times in (after, until], in order, without stepping minute by minute"""
+        fields = self.fields
+        start_day = after.date()
+        for year in fields['year']:
+            if year < after.year:
+                continue
+            if year > until.year:
+                return
+            for month in fields['month']:
+                if (year, month) < (after.year, after.month):
+                    continue
+                last_day = calendar.monthrange(year, month)[1]
+                days = {day for day in fields['day'] if day <= last_day}
+                days.update(last_day - days_back + 1 for days_back in self.days_from_end if days_back <= last_day)
+                for day in sorted(days):
+                    date = datetime.date(year, month, day)
+                    if date < start_day:
+                        continue
+                    if date > until.date():
+                        return
+                    if self.weekdays is not None and date.weekday() not in self.weekdays:
+                        continue
+                    for hour in fields['hour']:
+                        for minute in fields['minute']:
+                            for second in fields['second']:
+                                fire_time = datetime.datetime(year, month, day, hour, minute, second)
+                                if fire_time <= after:
+                                    continue
+                                if fire_time > until:
+                                    return
+                                yield fire_time
+
+
+def validate_interval(interval):
+    """Raises ScheduleError if systemd couldn't run the interval as intended"""
+    ScheduleSpec(interval)
+
+
+def interval_to_on_calendar(interval):
+    logging.debug(f'Converting interval to OnCalendar format: {interval}')
+    try:
+        validate_interval(interval)
+    except UnknownScheduleSyntax as e:
+        # written as given, like before validation existed; systemd has the last word
+        logging.warning(f'Passing interval through unvalidated: {e}')
+    parts = []
+
+    if 'dayOfWeek' in interval and interval['dayOfWeek']:
+        day_of_week = ','.join(interval['dayOfWeek'])
+        parts.append(day_of_week)
+
+    year_part = interval.get('year', {}).get('value', '*')
+    month_part = interval.get('month', {}).get('value', '*')
+    day_part = interval.get('day', {}).get('value', '*')
+
+    # Modify the parts if they contain a slash and the base is not an asterisk
+    if '/' in day_part:
+        base, step = day_part.split('/')
+        if base == '*':
+            base = STEP_BASES['day']  # Default to starting from the 1st day if base is '*'
+        day_part = f'{base}/{step}'
+
+    date_part = f'{year_part}-{month_part}-{day_part}'
+    parts.append(date_part)
+
+    hour = interval.get('hour', {}).get('value', '*')
+    minute = interval.get('minute', {}).get('value', '*')
+    second = interval.get('second', {}).get('value', '0')
+
+    # Modify the parts if they contain a slash
+    if '/' in hour:
+        base, step = hour.split('/')
+        if base == '*':
+            base = STEP_BASES['hour']  # Default to starting from 0 if base is '*'
+        hour = f'{base}/{step}'
+
+    if '/' in minute:
+        base, step = minute.split('/')
+        if base == '*':
+            base = STEP_BASES['minute']  # Default to starting from 0 if base is '*'
+        minute = f'{base}/{step}'
+
+    time_part = f'{hour}:{minute}:{second}'
+    parts.append(time_part)
+
+    on_calendar_value = ' '.join(parts)
+
+    return 'OnCalendar=' + on_calendar_value
+
+
+def iter_schedule_fire_times(specs, after, until):
+    """Merged, de-duplicated fire times of several intervals of one schedule"""
+    last = None
+    for fire_time in heapq.merge(*(spec.iter_fire_times(after, until) for spec in specs)):
+        if fire_time != last:
+            yield fire_time
+            last = fire_time
+
+
+def forecast_schedules(tasks, after, until, count, max_events=100000):
+    """Next `count` fire times of every task however far away they are, plus every
+    fire time up to `until` (capped at max_events per task) for contention checks.
+    tasks: [{"name", "template", "schedule": {"enabled", "intervals"}}]"""
+    forecasts = []
+    for task in tasks:
+        forecast = {
+            'name': task.get('name'),
+            'template': task.get('template'),
+            'enabled': bool(task.get('schedule', {}).get('enabled')),
+            'onCalendar': [],
+            'next': [],
+            'error': None,
+        }
+        forecasts.append(forecast)
+        try:
+            intervals = task.get('schedule', {}).get('intervals', [])
+            forecast['onCalendar'] = [interval_to_on_calendar(interval)[len('OnCalendar='):] for interval in intervals]
+            specs = [ScheduleSpec(interval) for interval in intervals]
+        except ScheduleError as e:
+            forecast['error'] = str(e)
+            continue
+        # stops after `count` fire times; the year range only bounds schedules that never fire
+        forecast['next'] = list(itertools.islice(iter_schedule_fire_times(specs, after, LAST_FIRE_TIME), count))
+        forecast['events'] = list(itertools.islice(iter_schedule_fire_times(specs, after, until), max_events))
+    return forecasts
+
+
+def find_contention(forecasts, window, max_concurrent=1, heavy_templates=HEAVY_TEMPLATES):
+    """Windows where more than max_concurrent distinct heavy tasks are due to start
+    within `window` (a timedelta) of each other. Disabled schedules are ignored."""
+    events = sorted(
+        (fire_time, forecast['name'], forecast['template'])
+        for forecast in forecasts
+        if forecast['enabled'] and forecast['template'] in heavy_templates
+        for fire_time in forecast.get('events', [])
+    )
+    windows = []
+    cluster = []
+    for event in events:
+        if cluster and event[0] - cluster[0][0] >= window:
+            windows.append(cluster)
+            cluster = []
+        cluster.append(event)
+    if cluster:
+        windows.append(cluster)
+
+    contention = []
+    for cluster in windows:
+        names = []
+        for _, name, template in cluster:
+            if (name, template) not in names:
+                names.append((name, template))
+        if len(names) > max_concurrent:
+            contention.append({
+                'start': cluster[0][0],
+                'end': cluster[-1][0],
+                'tasks': [{'name': name, 'template': template} for name, template in names],
+            })
+    return contention
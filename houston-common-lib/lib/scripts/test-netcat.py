@@ -63,56 +63,39 @@
 # if __name__ == "__main__":
 #     main()
 
-import subprocess
+# probe_netcat() comes from scripts/net_probe.py, which uses ssh_command() from
+# scripts/ssh_session.py; helpers.ts prepends both to this script.
+import sys
+import json
 import argparse
-import time
-
-def test_netcat(user, target, port):
-    try:
-        # Start Netcat listener remotely
-        listen_cmd = f'bash -c "nohup nc -lk {port} >/dev/null 2>&1 & disown"'
-        ssh_cmd_listener = ['ssh', f'{user}@{target}', listen_cmd]
-
-        print(f"Starting SSH listener command: {' '.join(ssh_cmd_listener)}")
-        subprocess.run(ssh_cmd_listener, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        # Allow listener to start
-        time.sleep(3)
-
-        # Test port connection
-        test_cmd = ['nc', '-zv', target, str(port)]
-        process_test = subprocess.run(
-            test_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-        )
-
-        # Kill the listener remotely after test
-        kill_cmd = ['ssh', f'{user}@{target}', f'fuser -k {port}/tcp']
-        subprocess.run(kill_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        if process_test.returncode != 0:
-            print(process_test.stderr.strip())
-            return False
-        else:
-            print(process_test.stderr.strip())
-            return True
-
-    except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        return False
+
+SAMPLE_BYTES = 1024 * 1024
+
+def test_netcat(user, target, port, timeout, retries, sample_bytes, listen=True):
+    result = {'success': False, 'host': target, 'port': port}
+    result.update(probe_netcat(f'{user}@{target}', target, port, timeout, retries, sample_bytes, listen))
+    result['success'] = result['reachable']
+    return result
 
 def main():
     parser = argparse.ArgumentParser(description='Test netcat connectivity')
     parser.add_argument('user', type=str, help='SSH user')
     parser.add_argument('ncTarget', type=str, help='Target hostname or IP address')
     parser.add_argument('port', type=int, help='Port to connect to')
+    parser.add_argument('-t', '--timeout', type=float, default=PROBE_TIMEOUT, help=f'seconds to keep trying to connect ({PROBE_TIMEOUT:g} by default)')
+    parser.add_argument('-r', '--retries', type=int, default=PROBE_RETRIES, help=f'connection attempts at most ({PROBE_RETRIES} by default)')
+    parser.add_argument('-s', '--sample', type=int, default=SAMPLE_BYTES, help=f'bytes to read for a throughput sample, 0 to skip ({SAMPLE_BYTES} by default)')
+    parser.add_argument('--no-listener', action='store_true', help='probe a port something already listens on instead of starting nc over ssh')
 
     args = parser.parse_args()
-
-    result = test_netcat(args.user, args.ncTarget, args.port)
-    print(f"Netcat test result: {result}")
+    if args.timeout <= 0 or args.retries < 1 or args.sample < 0:
+        parser.error("--timeout must be > 0, --retries >= 1 and --sample >= 0")
+
+    sample_bytes = 0 if args.no_listener else args.sample
+    result = test_netcat(args.user, args.ncTarget, args.port, args.timeout, args.retries, sample_bytes, not args.no_listener)
+    print(json.dumps(result))
+    if not result['success']:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,11 @@
+# ssh_command() comes from scripts/ssh_session.py, which helpers.ts prepends to this script.
 import subprocess
 import argparse
 
 def test_passwordless_ssh(target):
     try:
         # Attempt to run a command on the remote host without providing a password
-        test_cmd = ['ssh', target, 'echo Success']
+        test_cmd = ssh_command(target, ['echo Success'])
 
         process_test = subprocess.Popen(
             test_cmd,
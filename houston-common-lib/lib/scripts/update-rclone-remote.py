@@ -1,56 +1,55 @@
 #!/usr/bin/env python3
+# edit_rclone_conf() and RCLONE_CONF_PATH come from scripts/rclone_conf_store.py,
+# which RemoteManager.ts prepends to this script.
+import sys
 import argparse
-import configparser
 import json
 
-RCLONE_CONF_PATH = '/root/.config/rclone/rclone.conf'
-
-def edit_remote_in_conf(old_name, updated_remote):
-    config = configparser.ConfigParser()
-    config.read(RCLONE_CONF_PATH)
-
-    new_name = updated_remote["name"]
-    remote_type = updated_remote["type"]
-    auth_params = updated_remote["authParams"]
-
-    # Check if the old remote exists
-    if not config.has_section(old_name):
-        raise ValueError(f"Remote '{old_name}' not found")
-
-    # Rename the section if the name has changed
-    if old_name != new_name:
-        config[new_name] = config[old_name]
-        config.remove_section(old_name)
-
-    # Set the type of the remote
-    config.set(new_name, 'type', remote_type)
-
-    # Process and set each parameter from authParams, skipping empty values
-    for key, value in auth_params.items():
+def remote_values(remote):
+    values = {'type': remote["type"]}
+    # Process each parameter from authParams, skipping empty values
+    for key, value in remote["authParams"].items():
         if isinstance(value, dict):
             value = value.get("value", "")
         if value:  # Skip empty values
-            config.set(new_name, key, str(value))
-
-    # Write changes to the config file
-    with open(RCLONE_CONF_PATH, 'w') as configfile:
-        config.write(configfile)
-
-    print(f"Remote '{old_name}' successfully edited and saved as '{new_name}' in {RCLONE_CONF_PATH}")
+            values[key] = str(value)
+    return values
+
+def edit_remotes_in_conf(edits, conf_path=RCLONE_CONF_PATH):
+    """Apply [(old name, updated remote)] in one locked read-modify-write; if one of
+    them fails, none are applied. Sections are renamed and edited in place."""
+    with edit_rclone_conf(conf_path) as conf:
+        for old_name, updated_remote in edits:
+            new_name = updated_remote["name"]
+            # Rename the section if the name has changed
+            conf.rename(old_name, new_name)
+            conf.update(new_name, remote_values(updated_remote))
+
+    for old_name, updated_remote in edits:
+        print(f"Remote '{old_name}' successfully edited and saved as '{updated_remote['name']}' in {conf_path}")
 
 def main():
-    parser = argparse.ArgumentParser(description="Edit an existing CloudSyncRemote in rclone.conf")
-    parser.add_argument('--old_name', type=str, required=True, help="Existing remote name to be edited")
-    parser.add_argument('--data', type=str, required=True, help="JSON string of updated CloudSyncRemote data")
+    parser = argparse.ArgumentParser(description="Edit existing CloudSyncRemotes in rclone.conf")
+    parser.add_argument('--old_name', type=str, help="Existing remote name to be edited")
+    parser.add_argument('--data', type=str, help="JSON string of updated CloudSyncRemote data")
+    parser.add_argument('--batch', type=str, help='JSON list of {"oldName", "data"} to edit many remotes at once')
+    parser.add_argument('--config', type=str, default=RCLONE_CONF_PATH, help=f"rclone config file ({RCLONE_CONF_PATH} by default)")
 
     args = parser.parse_args()
+    if not args.batch and not (args.old_name and args.data):
+        parser.error("either --old_name and --data, or --batch is required")
     try:
-        updated_remote_data = json.loads(args.data)  # Parse JSON string to dictionary
-        edit_remote_in_conf(args.old_name, updated_remote_data)
-    except ValueError as e:
-        print(e)
+        if args.batch:
+            edits = [(edit["oldName"], edit["data"]) for edit in json.loads(args.batch)]
+        else:
+            edits = [(args.old_name, json.loads(args.data))]  # Parse JSON string to dictionary
+        edit_remotes_in_conf(edits, args.config)
     except json.JSONDecodeError:
-        print("Invalid JSON format for --data argument")
+        print("Invalid JSON format for --data argument", file=sys.stderr)
+        sys.exit(1)
+    except (ValueError, KeyError, OSError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
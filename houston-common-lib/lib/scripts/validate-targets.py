@@ -0,0 +1,122 @@
+# ssh_command(), ssh_destination() and ssh_session_open() come from
+# scripts/ssh_session.py, and probe_netcat() from scripts/net_probe.py, which
+# helpers.ts prepends to this script.
+import sys
+import json
+import time
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 8
+COMMAND_TIMEOUT = 30
+
+
+def elapsed_ms(started):
+    return round((time.monotonic() - started) * 1000, 1)
+
+
+def check_ssh(destination, port):
+    """Authenticate once; the session stays open for the checks that follow"""
+    started = time.monotonic()
+    error = ssh_session_open(destination, port)
+    return {'success': error is None, 'ms': elapsed_ms(started), 'error': error}
+
+
+def list_remote_pools(destination, port, timeout):
+    started = time.monotonic()
+    try:
+        result = subprocess.run(
+            ssh_command(destination, ['zpool', 'list', '-H', '-o', 'name'], port),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return {'success': False, 'ms': elapsed_ms(started), 'data': [], 'error': f"timed out after {timeout}s"}
+    if result.returncode != 0:
+        return {'success': False, 'ms': elapsed_ms(started), 'data': [], 'error': result.stderr.strip() or f"exited with {result.returncode}"}
+    return {'success': True, 'ms': elapsed_ms(started), 'data': [pool for pool in result.stdout.splitlines() if pool], 'error': None}
+
+
+def check_netcat(destination, host, port, timeout, sample_bytes):
+    started = time.monotonic()
+    result = probe_netcat(destination, host, port, timeout, sample_bytes=sample_bytes)
+    return {'success': result['reachable'], 'ms': elapsed_ms(started), **result}
+
+
+def validate_target(target, args):
+    """SSH auth, then remote pools and (when a netcat port is given) port reachability
+    of one target. Later checks are skipped when SSH fails, as they all need it."""
+    started = time.monotonic()
+    host = target['host']
+    port = str(target.get('port') or '22')
+    destination = ssh_destination(host, target.get('user') or 'root')
+    netcat_port = target.get('netcatPort')
+    report = {'host': host, 'user': target.get('user') or 'root', 'port': port, 'success': False, 'ms': None}
+    try:
+        report['ssh'] = check_ssh(destination, port)
+        if report['ssh']['success']:
+            report['pools'] = list_remote_pools(destination, port, args.timeout)
+            if netcat_port:
+                report['netcat'] = check_netcat(destination, host, int(netcat_port), args.timeout, args.sample)
+        else:
+            skipped = {'success': False, 'ms': None, 'error': 'skipped, ssh failed'}
+            report['pools'] = {**skipped, 'data': []}
+            if netcat_port:
+                report['netcat'] = skipped
+        report['success'] = all(report[check]['success'] for check in ('ssh', 'pools', 'netcat') if check in report)
+    except (OSError, ValueError) as e:
+        report['error'] = str(e)
+    report['ms'] = elapsed_ms(started)
+    return report
+
+
+def target_key(target):
+    return (target['host'], target.get('user') or 'root', str(target.get('port') or '22'), target.get('netcatPort'))
+
+
+def load_targets(targets_path):
+    if targets_path == '-':
+        return json.load(sys.stdin)
+    with open(targets_path, 'r') as targets_file:
+        return json.load(targets_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate replication targets concurrently: ssh auth, remote pools and netcat reachability')
+    parser.add_argument('-t', '--targets', type=str, default='-', help='JSON list of {"host", "user", "port", "netcatPort"}, "-" for stdin (default)')
+    parser.add_argument('-T', '--timeout', type=float, default=COMMAND_TIMEOUT, help=f'seconds each remote check may take ({COMMAND_TIMEOUT} by default)')
+    parser.add_argument('-s', '--sample', type=int, default=0, help='bytes to read for a netcat throughput sample (0, none, by default)')
+    parser.add_argument('-j', '--jobs', type=int, default=MAX_WORKERS, help=f'targets checked at once ({MAX_WORKERS} by default)')
+    args = parser.parse_args()
+
+    if args.timeout <= 0 or args.sample < 0 or args.jobs < 1:
+        parser.error("--timeout must be > 0, --sample >= 0 and --jobs >= 1")
+
+    try:
+        targets = load_targets(args.targets)
+        if not isinstance(targets, list) or not all(isinstance(target, dict) and target.get('host') for target in targets):
+            raise ValueError('targets must be a list of objects with a "host"')
+    except (OSError, ValueError) as e:
+        print(json.dumps({"success": False, "error": str(e), "targets": []}))
+        sys.exit(1)
+
+    started = time.monotonic()
+    # a target listed twice is checked once: in parallel, both checks would open the
+    # same ssh session and start netcat listeners on the same port
+    unique = {target_key(target): target for target in reversed(targets)}
+    if unique:
+        with ThreadPoolExecutor(max_workers=min(args.jobs, len(unique))) as executor:
+            checked = dict(zip(unique, executor.map(lambda target: validate_target(target, args), unique.values())))
+    else:
+        checked = {}
+    reports = [checked[target_key(target)] for target in targets]
+
+    print(json.dumps({
+        "success": all(report['success'] for report in reports),
+        "ms": elapsed_ms(started),
+        "targets": reports,
+    }))
+
+
+if __name__ == "__main__":
+    main()
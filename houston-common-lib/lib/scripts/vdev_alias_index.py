@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# Shared /etc/vdev_id.conf alias index.
+# Scripts run through `python3 -c`, so callers prepend this file to the script
+# source (see driveSlots/command.ts and server.ts) instead of importing it.
+# Keep it free of side effects at import time.
+import os
+
+VDEV_ID_CONF_PATH = "/etc/vdev_id.conf"
+
+
+class VdevAliasIndex:
+    """slot <-> /dev/disk/by-path mapping parsed from vdev_id.conf `alias` lines.
+    The file is only re-parsed when its inode, mtime or size changes."""
+
+    def __init__(self, path: str = VDEV_ID_CONF_PATH):
+        self.path = path
+        self.file_key = None
+        self.by_slot = {}  # slot -> by-path link, in file order
+        self.by_path = {}  # by-path link -> slot
+        self.by_node = {}  # /dev/sdX -> slot, resolved from the by-path links
+        self.by_node_checked = False
+
+    def refresh(self):
+        st = os.stat(self.path)
+        file_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        self.by_node_checked = False
+        if file_key == self.file_key:
+            return
+        by_slot = {}
+        with open(self.path, "r") as vdev_id:
+            for line in vdev_id:
+                fields = line.split()
+                if len(fields) < 3 or fields[0] != "alias":
+                    continue
+                by_slot[fields[1]] = fields[2]
+        self.by_slot = by_slot
+        self.by_path = {by_path: slot for slot, by_path in by_slot.items()}
+        self.by_node = {}
+        self.file_key = file_key
+
+    def slots(self) -> list:
+        return list(self.by_slot.keys())
+
+    def items(self) -> list:
+        """[(slot, by-path link)] in file order"""
+        return list(self.by_slot.items())
+
+    def path_for_slot(self, slot: str):
+        return self.by_slot.get(slot)
+
+    def slot_for_path(self, by_path: str):
+        return self.by_path.get(by_path)
+
+    def slot_for_device(self, device_node: str):
+        """Bay of a /dev/sdX node. The node map is rebuilt at most once per refresh()."""
+        slot = self.by_node.get(device_node)
+        if slot is not None:
+            by_path = self.by_slot[slot]
+            # the link is gone once the drive is pulled; keep the last known bay for removals
+            if not os.path.exists(by_path) or os.path.realpath(by_path) == device_node:
+                return slot
+        if self.by_node_checked:
+            return None
+        self.by_node = {
+            os.path.realpath(by_path): slot
+            for slot, by_path in self.by_slot.items()
+            if os.path.exists(by_path)
+        }
+        self.by_node_checked = True
+        return self.by_node.get(device_node)
+
+
+_vdev_alias_indexes = {}
+
+
+def get_vdev_alias_index(path: str = VDEV_ID_CONF_PATH) -> VdevAliasIndex:
+    """Shared, refreshed index for path"""
+    index = _vdev_alias_indexes.get(path)
+    if index is None:
+        index = _vdev_alias_indexes[path] = VdevAliasIndex(path)
+    index.refresh()
+    return index
@@ -11,6 +11,7 @@ import { assertProp } from "./utils";
 import { getentBashScriptJsonOuptut } from "./scripts/getent";
 
 import DiskInfoPy from "@/scripts/disk_info.py?raw";
+import VdevAliasIndexPy from "@/scripts/vdev_alias_index.py?raw";
 
 import {
   DriveSlot,
@@ -185,7 +186,7 @@ export class Server {
    * @returns
    */
   getDiskInfo() {
-    return this.execute(new PythonCommand(DiskInfoPy, [], { superuser: "try" }))
+    return this.execute(new PythonCommand(`${VdevAliasIndexPy}\n${DiskInfoPy}`, [], { superuser: "try" }))
       .map((proc) => proc.getStdout())
       .andThen(safeJsonParse<DiskInfo>)
       .map((di) => di as DiskInfo);